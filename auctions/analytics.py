@@ -0,0 +1,130 @@
+"""
+Bid analytics, rolled up incrementally from the Bid table.
+
+Bids are never edited once placed, so the Bid table is an append-only
+ledger and a rollup only has to read the bids past its high-water mark (the
+last Bid.id it has folded in). Each run aggregates a batch of new bids with
+GROUP BY queries (one set-based pass per rollup table, no per-bid Python),
+merges the totals into the rollup tables and moves the mark, all in one
+transaction, so every bid is counted exactly once even if a run dies midway.
+
+Rollups:
+- ListingPriceHistory: each listing's low/high price and bid count per hour,
+  the data behind the seller price chart.
+- CategoryDailyStats: bids and their total value per category per UTC day.
+  Every bid counts, outbid ones included, so this measures bidding activity,
+  not sales.
+
+On SQLite bids commit in id order (there is one writer at a time), so no bid
+can show up below the mark once it has moved past it.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDate, TruncHour
+
+from .models import Bid, CategoryDailyStats, ListingPriceHistory, RollupState
+
+
+ROLLUP = "bids"
+BATCH_SIZE = 50000
+
+
+def high_water_mark():
+    return RollupState.objects.filter(name=ROLLUP).values_list("last_bid_id", flat=True).first() or 0
+
+
+def update_rollups(batch_size=BATCH_SIZE):
+    """Fold every bid past the high-water mark into the rollups. Returns the number of bids folded in."""
+    RollupState.objects.get_or_create(name=ROLLUP)
+    processed = 0
+    while True:
+        mark = high_water_mark()
+        last_id = Bid.objects.aggregate(last=Max("id"))["last"] or 0
+        if last_id <= mark:
+            return processed
+        upper = min(mark + batch_size, last_id)
+
+        with transaction.atomic():
+            # Moving the mark first takes the write lock; if another run got
+            # here first the update matches nothing and we start over
+            if not RollupState.objects.filter(name=ROLLUP, last_bid_id=mark).update(last_bid_id=upper):
+                continue
+            bids = Bid.objects.filter(id__gt=mark, id__lte=upper)
+            processed += bids.count()
+            _roll_up_price_history(bids)
+            _roll_up_daily_stats(bids)
+
+
+def _roll_up_price_history(bids):
+    batch = list(
+        bids.annotate(hour=TruncHour("datetime_submitted", tzinfo=datetime.timezone.utc))
+        .values("listing_id", "hour")
+        .annotate(low=Min("value"), high=Max("value"), n=Count("id"))
+        .order_by()
+    )
+    if not batch:
+        return
+
+    # New bids are the latest ones, so this only reaches back over the last few hours
+    existing = {
+        (row.listing_id, row.hour): row
+        for row in ListingPriceHistory.objects.filter(hour__gte=min(row["hour"] for row in batch))
+    }
+    merged = []
+    for row in batch:
+        old = existing.get((row["listing_id"], row["hour"]))
+        merged.append(ListingPriceHistory(
+            listing_id=row["listing_id"], hour=row["hour"],
+            low=min(row["low"], old.low) if old else row["low"],
+            high=max(row["high"], old.high) if old else row["high"],
+            bid_count=row["n"] + (old.bid_count if old else 0),
+        ))
+    ListingPriceHistory.objects.bulk_create(
+        merged, batch_size=1000,
+        update_conflicts=True, unique_fields=["listing", "hour"], update_fields=["low", "high", "bid_count"]
+    )
+
+
+def _roll_up_daily_stats(bids):
+    batch = list(
+        bids.annotate(day=TruncDate("datetime_submitted", tzinfo=datetime.timezone.utc))
+        .values("day", category_id=F("listing__category_id"))
+        .annotate(n=Count("id"), bid_value=Sum("value"))
+        .order_by()
+    )
+    if not batch:
+        return
+
+    existing = {
+        (row.category_id, row.day): row
+        for row in CategoryDailyStats.objects.filter(day__gte=min(row["day"] for row in batch))
+    }
+    merged = []
+    for row in batch:
+        old = existing.get((row["category_id"], row["day"]))
+        merged.append(CategoryDailyStats(
+            category_id=row["category_id"], day=row["day"],
+            bid_count=row["n"] + (old.bid_count if old else 0),
+            bid_value=row["bid_value"] + (old.bid_value if old else 0),
+        ))
+    CategoryDailyStats.objects.bulk_create(
+        merged, batch_size=1000,
+        update_conflicts=True, unique_fields=["day", "category"], update_fields=["bid_count", "bid_value"]
+    )
+
+
+def price_history(listing_id):
+    """Chart points for a listing, oldest first, from the rollup rather than its bids."""
+    return list(
+        ListingPriceHistory.objects.filter(listing_id=listing_id).order_by("hour")
+        .values("hour", "low", "high", "bid_count")
+    )
+
+
+def daily_stats(since, category_id=None):
+    stats = CategoryDailyStats.objects.filter(day__gte=since)
+    if category_id:
+        stats = stats.filter(category_id=category_id)
+    return list(stats.order_by("day", "category_id").values("day", "category_id", "bid_count", "bid_value"))
@@ -0,0 +1,249 @@
+"""
+Read-only JSON API, version 1.
+
+Responses carry an ETag, and single listings a Last-Modified taken from
+AuctionListing.updated_at, so clients sending If-None-Match or
+If-Modified-Since get an empty 304 when nothing changed. `?fields=a,b`
+narrows both the columns selected and the payload. Bid histories are
+streamed in chunks rather than built in memory.
+"""
+import hashlib
+from functools import wraps
+
+from django.core.exceptions import BadRequest
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from commerce.database import read_from_replica
+
+from . import analytics
+from .models import AuctionListing, Bid, Category
+from .pagination import MAX_ID, PAGE_SIZE, keyset_page
+
+
+MAX_PAGE_SIZE = 100
+STREAM_CHUNK_SIZE = 500
+
+# API field name -> ORM lookup
+LISTING_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "description": "description",
+    "photo": "photo",
+    "category": "category_id",
+    "listed_by": "listed_by__username",
+    "current_bid": "current_bid",
+    "bid_count": "bid_count",
+    "comment_count": "comment_count",
+    "winning_user": "winning_user__username",
+    "is_active": "is_active",
+    "ends_at": "ends_at",
+    "datetime_submitted": "datetime_submitted",
+    "updated_at": "updated_at",
+}
+# Feeds leave out the description unless it is asked for
+LISTING_FEED_FIELDS = [name for name in LISTING_FIELDS if name != "description"]
+BID_FIELDS = {
+    "id": "id",
+    "user": "user__username",
+    "value": "value",
+    "datetime_submitted": "datetime_submitted",
+}
+CATEGORY_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "photo": "photo",
+}
+
+# No whitespace between tokens
+encoder = DjangoJSONEncoder(separators=(",", ":"))
+
+
+def api_view(view):
+    """Allow only GET/HEAD and report bad parameters as a JSON 400."""
+    @require_GET
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except BadRequest as e:
+            return JsonResponse({"error": str(e)}, status=400)
+    return wrapper
+
+
+def selected_fields(request, fields, default=None):
+    """Return the API field names asked for with `?fields=`, or `default`."""
+    names = [name for name in request.GET.get("fields", "").split(",") if name]
+    if not names:
+        return list(default or fields)
+    unknown = [name for name in names if name not in fields]
+    if unknown:
+        raise BadRequest(f"Unknown field(s): {', '.join(unknown)}.")
+    return names
+
+
+def int_param(request, name, default=None, maximum=None):
+    value = request.GET.get(name)
+    if not value:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer.")
+    # Past MAX_ID the query itself would fail, so that bound always applies
+    maximum = min(maximum or MAX_ID, MAX_ID)
+    if not 1 <= value <= maximum:
+        raise BadRequest(f"{name} must be between 1 and {maximum}.")
+    return value
+
+
+def columns(names, fields, *extra):
+    """ORM lookups for `names`, plus any `extra` lookups the view itself needs."""
+    return list(dict.fromkeys([fields[name] for name in names] + list(extra)))
+
+
+def serializer(names, fields):
+    lookups = [(name, fields[name]) for name in names]
+
+    def serialize(row):
+        data = {name: row[lookup] for name, lookup in lookups}
+        if "photo" in data:
+            data["photo"] = default_storage.url(data["photo"]) if data["photo"] else None
+        return data
+    return serialize
+
+
+def json_response(data):
+    return HttpResponse(encoder.encode(data), content_type="application/json")
+
+
+def stream_results(rows, serialize):
+    """Yield `{"results": [...]}` a chunk of rows at a time."""
+    yield '{"results":['
+    separator, chunk = "", []
+    for row in rows:
+        chunk.append(encoder.encode(serialize(row)))
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield separator + ",".join(chunk)
+            separator, chunk = ",", []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]}"
+
+
+def conditional(request, version, last_modified, respond):
+    """
+    Answer a conditional GET with 304 when `version` (any repr-able value
+    identifying the representation) still matches, else call `respond()`.
+    """
+    etag = quote_etag(hashlib.md5(repr(version).encode()).hexdigest())
+    last_modified = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = respond()
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    # Clients may keep a copy but have to revalidate it
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+@api_view
+@read_from_replica
+def listings(request):
+    names = selected_fields(request, LISTING_FIELDS, LISTING_FEED_FIELDS)
+    queryset = AuctionListing.objects.all()
+    if not request.GET.get("include_closed"):
+        queryset = queryset.filter(is_active=True)
+    category = int_param(request, "category")
+    if category:
+        queryset = queryset.filter(category_id=category)
+
+    rows, next_cursor = keyset_page(
+        queryset.values(*columns(names, LISTING_FIELDS, "id", "datetime_submitted", "updated_at")),
+        request.GET.get("after"),
+        page_size=int_param(request, "limit", PAGE_SIZE, MAX_PAGE_SIZE)
+    )
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["after"] = next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+
+    serialize = serializer(names, LISTING_FIELDS)
+    # No Last-Modified: a listing leaving the page can bring in older ones, so the
+    # newest updated_at can go down; the ETag covers which rows are on the page
+    return conditional(
+        request,
+        (names, [(row["id"], row["updated_at"]) for row in rows], next_cursor),
+        None,
+        lambda: json_response({"results": [serialize(row) for row in rows], "next": next_url})
+    )
+
+
+@api_view
+@read_from_replica
+def listing(request, listing_id):
+    names = selected_fields(request, LISTING_FIELDS)
+    row = AuctionListing.objects.filter(id=listing_id).values(*columns(names, LISTING_FIELDS, "updated_at")).first()
+    if row is None:
+        raise Http404("No such listing.")
+
+    return conditional(
+        request,
+        (names, listing_id, row["updated_at"]),
+        row["updated_at"],
+        lambda: json_response(serializer(names, LISTING_FIELDS)(row))
+    )
+
+
+@api_view
+def listing_bids(request, listing_id):
+    names = selected_fields(request, BID_FIELDS)
+    # Every bid bumps updated_at, so the listing row versions its bid history too
+    listing = AuctionListing.objects.filter(id=listing_id).values("updated_at", "bid_count").first()
+    if listing is None:
+        raise Http404("No such listing.")
+
+    def respond():
+        # Each accepted bid is higher than the last, so this is newest first, off bid_listing_value_idx
+        rows = (
+            Bid.objects.filter(listing_id=listing_id).order_by("-value")
+            .values(*columns(names, BID_FIELDS)).iterator(chunk_size=STREAM_CHUNK_SIZE)
+        )
+        return StreamingHttpResponse(
+            stream_results(rows, serializer(names, BID_FIELDS)), content_type="application/json"
+        )
+
+    return conditional(
+        request, (names, listing_id, listing["updated_at"], listing["bid_count"]), listing["updated_at"], respond
+    )
+
+
+@api_view
+@read_from_replica
+def listing_price_history(request, listing_id):
+    # Chart data comes from the hourly rollup, which only changes when the rollup runs
+    mark = analytics.high_water_mark()
+    return conditional(
+        request, (listing_id, mark), None,
+        lambda: json_response({"high_water_mark": mark, "results": analytics.price_history(listing_id)})
+    )
+
+
+@api_view
+@read_from_replica
+def categories(request):
+    names = selected_fields(request, CATEGORY_FIELDS)
+    rows = list(Category.objects.order_by("id").values(*columns(names, CATEGORY_FIELDS)))
+    serialize = serializer(names, CATEGORY_FIELDS)
+    results = [serialize(row) for row in rows]
+
+    # Categories have no timestamp; version them by content
+    return conditional(request, results, None, lambda: json_response({"results": results}))
@@ -0,0 +1,61 @@
+"""
+Signed-in users served from the cache.
+
+Django's AuthenticationMiddleware reads the User row on every request that
+touches request.user, which is every page (the nav shows the username and
+watchlist count). With USER_CACHE_TIMEOUT set, get_user() keeps signed-in
+users in the USER_CACHE cache and accepts a cached copy only when the
+session's auth hash matches it, the same check Django makes against the
+database copy. Anything else falls through to django.contrib.auth.get_user.
+Saving a user or changing their watchlist count drops the cached copy.
+
+The cache must be shared between processes (not the default locmem) for a
+password change in one process to end the old sessions in all of them.
+"""
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.crypto import constant_time_compare
+
+from .models import User
+
+
+def _cache():
+    return caches[getattr(settings, "USER_CACHE", "default")]
+
+
+def _key(user_id):
+    return f"user:{user_id}"
+
+
+def get_user(request):
+    timeout = getattr(settings, "USER_CACHE_TIMEOUT", 0)
+    if not timeout:
+        return auth.get_user(request)
+    try:
+        user_id = User._meta.pk.to_python(request.session[auth.SESSION_KEY])
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        # Not signed in; no need to look anything up
+        return AnonymousUser()
+
+    user = _cache().get(_key(user_id))
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if (
+        user is not None and user.is_active and session_hash
+        and backend_path in settings.AUTHENTICATION_BACKENDS
+        and constant_time_compare(session_hash, user.get_session_auth_hash())
+    ):
+        return user
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        _cache().set(_key(user.pk), user, timeout)
+    return user
+
+
+def invalidate_user(user_id):
+    """Drop the cached copy of a user once the current transaction commits."""
+    transaction.on_commit(lambda: _cache().delete(_key(user_id)))
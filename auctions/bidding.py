@@ -0,0 +1,166 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import events
+from .models import AuctionListing, Bid, ProxyBid
+
+
+# How far a proxy bid goes above the price it has to beat
+INCREMENT = Decimal(str(getattr(settings, "PROXY_BID_INCREMENT", "1.00")))
+
+
+class BidRejected(Exception):
+    """The bid could not be placed on the listing."""
+
+
+class BidTooLow(BidRejected):
+    pass
+
+
+class BidContention(BidRejected):
+    """The bid was above the price the bidder saw, but another bid got in first."""
+
+
+class ListingClosed(BidRejected):
+    pass
+
+
+class OwnListing(BidRejected):
+    """Sellers can't bid on their own listings, by hand or through a proxy."""
+
+
+def _is_open(listing, now):
+    return listing.is_active and not (listing.ends_at and listing.ends_at <= now)
+
+
+def _write_bid(listing, user, value, now, **condition):
+    """
+    Move `listing` to `value` for `user` if the row still matches `condition`,
+    and record the Bid. Returns the Bid, or None if the row did not match.
+    """
+    with transaction.atomic():
+        # Losing bids stop here, having written nothing
+        updated = AuctionListing.objects.filter(
+            Q(ends_at__isnull=True) | Q(ends_at__gt=now), id=listing.id, is_active=True, **condition
+        ).update(current_bid=value, winning_user=user, bid_count=F("bid_count") + 1, updated_at=now)
+        if not updated:
+            return None
+
+        bid = Bid.objects.create(user=user, listing=listing, value=value)
+        AuctionListing.objects.filter(id=listing.id).update(
+            highest_bid=bid, last_bid_at=bid.datetime_submitted
+        )
+
+    listing.current_bid = value
+    listing.winning_user = user
+    listing.highest_bid = bid
+    listing.bid_count += 1
+    listing.last_bid_at = bid.datetime_submitted
+
+    events.publish(
+        listing.id, "bid",
+        current_bid=value, bid_count=listing.bid_count, winning_user=user.username
+    )
+    return bid
+
+
+def place_bid(listing, user, value):
+    """
+    Place a bid of `value` on `listing` for `user`.
+
+    The price check and the price update happen in a single conditional UPDATE,
+    so two concurrent bidders can never both win: the database only lets the
+    row change while `current_bid` is still lower than the new value. The Bid
+    row and the listing's bid summary (`bid_count`, `highest_bid`,
+    `last_bid_at`) are written in the same transaction, which keeps the listing
+    consistent with its highest Bid at all times.
+
+    `listing` is the instance the bidder was shown; its `current_bid` is used to
+    tell a plain low bid apart from one that lost a race. On success the
+    instance is updated in place and the new Bid is returned. Proxy bids on the
+    listing then get their chance to answer it.
+    """
+    now = timezone.now()
+    if not _is_open(listing, now):
+        raise ListingClosed("This auction is closed.")
+    if listing.listed_by_id == user.id:
+        raise OwnListing("You can't bid on your own listing.")
+    if value <= listing.current_bid:
+        raise BidTooLow("Your bid must be higher than the current bid.")
+
+    bid = _write_bid(listing, user, value, now, current_bid__lt=value)
+    if bid is None:
+        # Find out why the row did not match
+        current = AuctionListing.objects.filter(id=listing.id).values("is_active", "ends_at", "current_bid").first()
+        if current is None or not current["is_active"] or (current["ends_at"] and current["ends_at"] <= now):
+            raise ListingClosed("This auction is closed.")
+        listing.current_bid = current["current_bid"]
+        raise BidContention("Someone placed a higher bid while you were bidding. Please try again.")
+
+    resolve_proxy_bids(listing)
+    return bid
+
+
+def set_proxy_bid(listing, user, max_value):
+    """
+    Store the most `user` will pay for `listing`, then bid for them as far as
+    it takes. Returns the Bid placed for whoever leads afterwards, if any.
+    """
+    if not _is_open(listing, timezone.now()):
+        raise ListingClosed("This auction is closed.")
+    if listing.listed_by_id == user.id:
+        raise OwnListing("You can't bid on your own listing.")
+    if max_value <= listing.current_bid:
+        raise BidTooLow("Your maximum must be higher than the current bid.")
+
+    ProxyBid.objects.update_or_create(user=user, listing=listing, defaults={"max_value": max_value})
+    return resolve_proxy_bids(listing)
+
+
+def resolve_proxy_bids(listing, attempts=3):
+    """
+    Settle every proxy bid competing for `listing` at once.
+
+    Rather than replaying the bidding war one increment at a time, the two
+    highest maximums decide it: the highest wins (the earliest, on a tie) at
+    one INCREMENT above the runner-up's maximum, or at the price it has to
+    beat, but never above its own maximum. That is a single price write and a
+    single Bid, however many proxies are involved. `listing.current_bid` and
+    `winning_user_id` are taken as the current state; if another bid got in
+    meanwhile, the listing is re-read and the resolution run again.
+    """
+    for attempt in range(attempts):
+        if attempt:
+            listing.refresh_from_db(fields=["current_bid", "winning_user", "is_active", "ends_at"])
+        now = timezone.now()
+        if not _is_open(listing, now):
+            return None
+
+        seen = listing.current_bid
+        proxies = list(
+            # A seller's proxy left from before they were refused never bids
+            ProxyBid.objects.filter(listing_id=listing.id, max_value__gt=seen)
+            .exclude(user_id=F("listing__listed_by_id"))
+            .select_related("user").order_by("-max_value", "created_at")[:2]
+        )
+        if not proxies:
+            return None
+        leader = proxies[0]
+        runner_up = proxies[1] if len(proxies) > 1 else None
+
+        if leader.user_id == listing.winning_user_id:
+            if runner_up is None:
+                # Already winning and nobody can outbid them
+                return None
+            price = min(leader.max_value, runner_up.max_value + INCREMENT)
+        else:
+            price = min(leader.max_value, max(seen, runner_up.max_value if runner_up else seen) + INCREMENT)
+
+        bid = _write_bid(listing, leader.user, price, now, current_bid=seen)
+        if bid is not None:
+            return bid
+    return None
@@ -0,0 +1,144 @@
+"""
+Versioned fragment caching for listings, and the cached category summary.
+
+Every listing has a version number in the cache. Rendered fragments (cards,
+bid summary, comments) are cached under keys that include the version, and
+anything that changes what a listing looks like bumps it, so stale fragments
+are never read again and simply expire.
+"""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, cache, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import AuctionListing, Category
+
+
+TIMEOUT = getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 600)
+CATEGORY_SUMMARY_TIMEOUT = getattr(settings, "CATEGORY_SUMMARY_TIMEOUT", 300)
+CATEGORY_SUMMARY_KEY = "category-summary"
+
+
+def fragment_cache():
+    # Same lookup as Django's {% cache %} tag
+    try:
+        return caches["template_fragments"]
+    except InvalidCacheBackendError:
+        return caches["default"]
+
+
+def _version_key(listing_id):
+    return f"listing-version:{listing_id}"
+
+
+def _new_version():
+    # Start from the clock rather than 0, so a version that was evicted from
+    # the cache can't come back with a number old fragments were stored under
+    return time.time_ns()
+
+
+def listing_versions(listing_ids):
+    """Return {listing_id: version} for `listing_ids` with a single cache round trip."""
+    cache = fragment_cache()
+    keys = {_version_key(listing_id): listing_id for listing_id in listing_ids}
+    found = cache.get_many(keys)
+    versions = {keys[key]: version for key, version in found.items()}
+
+    missing = {key: _new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update((keys[key], version) for key, version in missing.items())
+    return versions
+
+
+def attach_versions(listings):
+    """Set `cache_version` on each listing for the fragment tags. Returns `listings`."""
+    versions = listing_versions([listing.id for listing in listings])
+    for listing in listings:
+        listing.cache_version = versions[listing.id]
+    return listings
+
+
+def bump_listing_version(listing_id):
+    cache = fragment_cache()
+    try:
+        cache.incr(_version_key(listing_id))
+    except ValueError:
+        cache.set(_version_key(listing_id), _new_version(), None)
+
+
+class FragmentStats:
+    """Per-process hit and miss counters, by fragment name."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = Counter()
+        self.misses = Counter()
+
+    def record(self, name, hit):
+        with self.lock:
+            (self.hits if hit else self.misses)[name] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: {"hits": self.hits[name], "misses": self.misses[name]}
+                for name in sorted(set(self.hits) | set(self.misses))
+            }
+
+    def reset(self):
+        with self.lock:
+            self.hits.clear()
+            self.misses.clear()
+
+
+stats = FragmentStats()
+
+
+def get_or_render(name, listing, vary_on, render):
+    version = getattr(listing, "cache_version", None)
+    if version is None:
+        version = listing_versions([listing.id])[listing.id]
+    key = make_template_fragment_key(name, [listing.id, version, *vary_on])
+
+    cache = fragment_cache()
+    value = cache.get(key)
+    stats.record(name, value is not None)
+    if value is None:
+        value = render()
+        cache.set(key, value, TIMEOUT)
+    return value
+
+
+def category_summaries():
+    """
+    Every category with `active_count`, `min_price` and `max_price` of its
+    active listings, from one annotated query, cached until a listing is created or
+    closed. Bids move prices without invalidating, so the ranges can lag by
+    up to CATEGORY_SUMMARY_TIMEOUT.
+    """
+    summaries = cache.get(CATEGORY_SUMMARY_KEY)
+    if summaries is None:
+        # Correlated subqueries rather than a LEFT JOIN: SQLite only uses the partial
+        # active_category_price_idx for WHERE terms, and there MIN/MAX are single seeks
+        active = AuctionListing.objects.filter(category=OuterRef("pk"), is_active=True).order_by()
+        summaries = list(
+            Category.objects.annotate(
+                active_count=Coalesce(
+                    Subquery(active.values("category").annotate(n=Count("id")).values("n")), Value(0)
+                ),
+                min_price=Subquery(active.order_by("current_bid").values("current_bid")[:1]),
+                max_price=Subquery(active.order_by("-current_bid").values("current_bid")[:1]),
+            ).order_by("id")
+        )
+        cache.set(CATEGORY_SUMMARY_KEY, summaries, CATEGORY_SUMMARY_TIMEOUT)
+    return summaries
+
+
+def invalidate_category_summaries():
+    cache.delete(CATEGORY_SUMMARY_KEY)
@@ -0,0 +1,49 @@
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from . import events
+from .caching import bump_listing_version, invalidate_category_summaries
+from .models import AuctionListing, Bid
+
+
+BATCH_SIZE = 500
+
+
+def close_due_auctions(now=None, batch_size=BATCH_SIZE):
+    """
+    Close every active listing whose `ends_at` has passed and return how many were closed.
+
+    Listings are closed in batches with one UPDATE each, which also sets
+    `winning_user` to the author of the highest bid (the earliest one on ties).
+    The UPDATE only matches listings that are still active, so running
+    several closers at once never closes a listing twice or changes its
+    winner; at worst two closers both announce the same listing as closed,
+    which clients ignore.
+    """
+    now = now or timezone.now()
+    winner = Bid.objects.filter(listing=OuterRef("pk")).order_by("-value", "id").values("user")[:1]
+    closed = 0
+
+    while True:
+        due = list(
+            AuctionListing.objects.filter(is_active=True, ends_at__lte=now)
+            .order_by("ends_at").values_list("id", flat=True)[:batch_size]
+        )
+        if not due:
+            return closed
+
+        with transaction.atomic():
+            closed += AuctionListing.objects.filter(id__in=due, is_active=True).update(
+                is_active=False, winning_user=Subquery(winner), updated_at=timezone.now()
+            )
+            # Queryset updates skip the signals that normally do this
+            for listing_id in due:
+                transaction.on_commit(lambda listing_id=listing_id: bump_listing_version(listing_id))
+            transaction.on_commit(invalidate_category_summaries)
+            winners = dict(
+                AuctionListing.objects.filter(id__in=due)
+                .values_list("id", "winning_user__username")
+            )
+            for listing_id in due:
+                events.publish(listing_id, "closed", winning_user=winners.get(listing_id))
@@ -0,0 +1,146 @@
+"""
+Live listing events (new bids, auction closed) pushed to browsers over
+Server-Sent Events.
+
+Views publish events from synchronous code; `listing_events` streams them to
+every client watching the listing. The default broker keeps subscribers in
+process memory, so it needs no external service but only reaches clients
+connected to the same worker. Deployments running several workers can point
+the AUCTION_EVENTS_BROKER setting at a Broker subclass backed by a shared
+bus.
+
+Streams are only served under ASGI (commerce.asgi). A WSGI server buffers a
+StreamingHttpResponse over an async generator until it ends, so each open
+page would hold a worker thread for MAX_STREAM_AGE and receive nothing;
+there `listing_events` answers 204, which tells EventSource to stop, and
+the listing page doesn't open a stream at all.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    def __init__(self, broker, listing_id, maxsize):
+        self.broker = broker
+        self.listing_id = listing_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, event):
+        # A client that stopped reading loses events rather than growing memory;
+        # the next one it receives carries the current price anyway
+        if not self.queue.full():
+            self.queue.put_nowait(event)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def subscribe(self, listing_id):
+        """Return a Subscription for events on `listing_id`. Must be called from the event loop."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+    def publish(self, listing_id, event):
+        """Send `event` to every subscriber of `listing_id`. Safe to call from any thread."""
+        raise NotImplementedError
+
+
+class InProcessBroker(Broker):
+    def __init__(self, queue_size=16):
+        self.queue_size = queue_size
+        self.subscribers = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, listing_id):
+        subscription = Subscription(self, listing_id, self.queue_size)
+        with self.lock:
+            self.subscribers[listing_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            listeners = self.subscribers.get(subscription.listing_id)
+            if listeners is not None:
+                listeners.discard(subscription)
+                if not listeners:
+                    del self.subscribers[subscription.listing_id]
+
+    def publish(self, listing_id, event):
+        with self.lock:
+            listeners = list(self.subscribers.get(listing_id, ()))
+        for subscription in listeners:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # Its event loop has shut down
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, listing_id=None):
+        with self.lock:
+            if listing_id is not None:
+                return len(self.subscribers.get(listing_id, ()))
+            return sum(len(listeners) for listeners in self.subscribers.values())
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, "AUCTION_EVENTS_BROKER", "auctions.events.InProcessBroker"))()
+    return _broker
+
+
+def publish(listing_id, event_type, **data):
+    """Publish an event once the current transaction commits."""
+    event = {"type": event_type, **data}
+    transaction.on_commit(lambda: get_broker().publish(listing_id, event))
+
+
+KEEPALIVE = getattr(settings, "AUCTION_EVENTS_KEEPALIVE", 15)
+# Streams end after this many seconds and the browser reconnects, which bounds
+# how long a connection whose client silently went away can linger
+MAX_STREAM_AGE = getattr(settings, "AUCTION_EVENTS_MAX_AGE", 300)
+
+
+def streaming_supported(request):
+    """Whether `request` came through the ASGI handler, which can hold a stream open without a thread."""
+    return isinstance(request, ASGIRequest)
+
+
+def format_event(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def stream(listing_id):
+    subscription = get_broker().subscribe(listing_id)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + MAX_STREAM_AGE
+    try:
+        yield "retry: 3000\n\n"
+        while loop.time() < deadline:
+            try:
+                event = await asyncio.wait_for(subscription.get(), KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+            if event["type"] == "closed":
+                break
+    finally:
+        subscription.close()
@@ -1,12 +1,18 @@
 from django import forms
 
-from .models import AuctionListing, Comment, Bid
+from .models import AuctionListing, Category, Comment, Bid, ProxyBid
 
 
 class CreateListingForm(forms.ModelForm):
     class Meta:
         model = AuctionListing
-        fields = ['name', 'description', 'current_bid', 'photo', 'category']
+        fields = ['name', 'description', 'current_bid', 'photo', 'category', 'ends_at']
+        widgets = {
+            'ends_at': forms.DateTimeInput(attrs={'type': 'datetime-local'})
+        }
+        labels = {
+            'ends_at': 'Ends at (optional)',
+        }
 
     
 class CreateCommentForm(forms.ModelForm):
@@ -27,4 +33,39 @@ class CreateBidForm(forms.ModelForm):
         fields = ['value']
         labels = {
             'value': '',
-        }
\ No newline at end of file
+        }
+
+
+class ProxyBidForm(forms.ModelForm):
+    class Meta:
+        model = ProxyBid
+        fields = ['max_value']
+        labels = {
+            'max_value': 'Bid for me automatically, up to',
+        }
+
+
+class CategoryFilterForm(forms.Form):
+    # Sort name -> keyset ordering; every one is served by an active_category_*_idx index
+    ORDERINGS = {
+        'newest': ('-datetime_submitted', '-id'),
+        'price': ('current_bid', 'id'),
+        'price_desc': ('-current_bid', '-id'),
+        'ending': ('ends_at', 'id'),
+    }
+
+    sort = forms.ChoiceField(
+        choices=[('newest', 'Newest'), ('price', 'Lowest price'), ('price_desc', 'Highest price'), ('ending', 'Ending soon')],
+        required=False
+    )
+    include_closed = forms.BooleanField(required=False, label='Include closed auctions')
+
+    def ordering(self):
+        return self.ORDERINGS[self.cleaned_data.get('sort') or 'newest']
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(max_length=200, label='', widget=forms.TextInput(attrs={'placeholder': 'Search listings'}))
+    category = forms.ModelChoiceField(queryset=Category.objects.all(), required=False, empty_label='All categories')
+    include_closed = forms.BooleanField(required=False, label='Include closed auctions')
+    page = forms.IntegerField(min_value=1, max_value=100, required=False, widget=forms.HiddenInput)
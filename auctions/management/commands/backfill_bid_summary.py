@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+
+from auctions.models import AuctionListing, Bid
+
+
+class Command(BaseCommand):
+    help = "Recompute bid_count, highest_bid and last_bid_at on every listing from its Bid rows."
+
+    def handle(self, *args, **options):
+        bids = Bid.objects.filter(listing=OuterRef("pk"))
+        # Ties on value go to the bid that reached that price first
+        highest = bids.order_by("-value", "id").values("id")[:1]
+        count = bids.order_by().values("listing").annotate(n=Count("id")).values("n")
+        latest = bids.order_by().values("listing").annotate(at=Max("datetime_submitted")).values("at")
+
+        with transaction.atomic():
+            updated = AuctionListing.objects.update(
+                bid_count=Coalesce(Subquery(count), Value(0)),
+                highest_bid=Subquery(highest),
+                last_bid_at=Subquery(latest),
+                updated_at=Now(),
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Updated the bid summary of {updated} listing(s)."))
@@ -0,0 +1,120 @@
+import asyncio
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from auctions.models import User, Category, AuctionListing
+
+
+class ThreadSampler:
+    """Record the most threads alive at once while the block runs."""
+
+    def __enter__(self):
+        self.peak = threading.active_count()
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def sample(self):
+        while self.running:
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(0.005)
+
+    def __exit__(self, *exc):
+        self.running = False
+        self.thread.join()
+        # Don't count the sampler itself
+        self.peak -= 1
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve the same mix of read pages through the ASGI handler (one event loop, like uvicorn) "
+        "and the WSGI handler (one thread per in-flight request) at equal concurrency, and compare."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--prefix", default="seed", help="Username prefix used by seed_data")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username__startswith=f"{options['prefix']}-").first()
+        listing = AuctionListing.objects.filter(is_active=True).order_by("-bid_count").first()
+        category = Category.objects.first()
+        if not (user and listing and category):
+            raise CommandError("Nothing to test against; run seed_data first.")
+
+        paths = [
+            reverse("index"),
+            reverse("categories"),
+            reverse("category_matches", args=[category.id]),
+            reverse("listing_details", args=[listing.id]),
+            reverse("watchlist"),
+        ]
+        paths = [paths[i % len(paths)] for i in range(options["requests"])]
+        concurrency = options["concurrency"]
+        # The test clients send Host: testserver; the ASGI one can't be told otherwise
+        override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]).enable()
+        # Both handlers open their own connections
+        connection.close()
+
+        self.report("WSGI", *self.run_wsgi(user, paths, concurrency))
+        self.report("ASGI", *self.run_asgi(user, paths, concurrency))
+
+    def run_wsgi(self, user, paths, concurrency):
+        local = threading.local()
+
+        def get(path):
+            if not hasattr(local, "client"):
+                local.client = Client()
+                local.client.force_login(user)
+            start = time.perf_counter()
+            status = local.client.get(path).status_code
+            return status, time.perf_counter() - start
+
+        with ThreadSampler() as threads:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(concurrency) as pool:
+                results = list(pool.map(get, paths))
+            elapsed = time.perf_counter() - start
+        return results, elapsed, threads.peak
+
+    def run_asgi(self, user, paths, concurrency):
+        client = AsyncClient()
+        client.force_login(user)
+
+        async def main():
+            limit = asyncio.Semaphore(concurrency)
+
+            async def get(path):
+                async with limit:
+                    start = time.perf_counter()
+                    response = await client.get(path)
+                    return response.status_code, time.perf_counter() - start
+
+            return await asyncio.gather(*(get(path) for path in paths))
+
+        with ThreadSampler() as threads:
+            start = time.perf_counter()
+            results = asyncio.run(main())
+            elapsed = time.perf_counter() - start
+        return results, elapsed, threads.peak
+
+    def report(self, name, results, elapsed, peak_threads):
+        errors = sum(1 for status, _ in results if status >= 400)
+        timings = sorted(seconds * 1000 for _, seconds in results)
+        p95 = timings[int(len(timings) * 0.95)]
+        self.stdout.write(
+            f"{name}: {len(results) / elapsed:.0f} req/s, p50 {statistics.median(timings):.1f}ms, "
+            f"p95 {p95:.1f}ms, peak {peak_threads} threads, {errors} errors"
+        )
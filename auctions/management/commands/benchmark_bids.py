@@ -0,0 +1,96 @@
+import threading
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, close_old_connections
+from django.db.models import Max
+
+from auctions.bidding import place_bid, BidRejected
+from auctions.models import User, Category, AuctionListing, Bid
+
+
+class Command(BaseCommand):
+    help = "Hammer a single listing with concurrent bids and check the final price matches the highest Bid."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--bids", type=int, default=200, help="Bids per thread")
+        parser.add_argument("--min-rate", type=float, default=0, help="Fail if accepted+rejected bids/sec falls below this")
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        per_thread = options["bids"]
+
+        category = Category.objects.create(name="benchmark")
+        seller = User.objects.create_user("benchmark-seller")
+        bidders = [User.objects.create_user(f"benchmark-bidder-{i}") for i in range(threads)]
+        listing = AuctionListing.objects.create(
+            name="benchmark", description="", current_bid=Decimal("1.00"),
+            category=category, listed_by=seller
+        )
+
+        accepted = [0] * threads
+        rejected = [0] * threads
+        barrier = threading.Barrier(threads)
+
+        def worker(i):
+            try:
+                barrier.wait()
+                for n in range(per_thread):
+                    # Interleave the value sequences so threads constantly outbid each other
+                    value = Decimal(2 + n * threads + i)
+                    seen = AuctionListing.objects.only(
+                        "id", "is_active", "ends_at", "current_bid", "listed_by"
+                    ).get(id=listing.id)
+                    try:
+                        place_bid(seen, bidders[i], value)
+                        accepted[i] += 1
+                    except BidRejected:
+                        rejected[i] += 1
+            finally:
+                connection.close()
+
+        # Worker threads open their own connections; don't leak ours into them
+        close_old_connections()
+        pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        try:
+            listing.refresh_from_db()
+            bids = Bid.objects.filter(listing=listing)
+            highest = bids.aggregate(Max("value"))["value__max"]
+            top_bid = bids.order_by("-value").first()
+            total = threads * per_thread
+            rate = total / elapsed
+
+            self.stdout.write(
+                f"{total} bids in {elapsed:.2f}s ({rate:.0f} bids/sec): "
+                f"{sum(accepted)} accepted, {sum(rejected)} rejected"
+            )
+
+            if bids.count() != sum(accepted):
+                raise CommandError(f"{bids.count()} Bid rows for {sum(accepted)} accepted bids.")
+            if listing.bid_count != sum(accepted) or listing.highest_bid_id != top_bid.id:
+                raise CommandError(
+                    f"Listing summary shows {listing.bid_count} bid(s) with highest Bid {listing.highest_bid_id}, "
+                    f"expected {sum(accepted)} with highest Bid {top_bid.id}."
+                )
+            if listing.current_bid != highest or listing.winning_user_id != top_bid.user_id:
+                raise CommandError(
+                    f"Listing shows {listing.current_bid} by user {listing.winning_user_id}, "
+                    f"highest Bid is {highest} by user {top_bid.user_id}."
+                )
+            if rate < options["min_rate"]:
+                raise CommandError(f"{rate:.0f} bids/sec is below the required {options['min_rate']:.0f}.")
+            self.stdout.write(self.style.SUCCESS("current_bid and winning_user match the highest Bid."))
+        finally:
+            listing.delete()
+            seller.delete()
+            User.objects.filter(id__in=[u.id for u in bidders]).delete()
+            category.delete()
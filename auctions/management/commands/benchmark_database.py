@@ -0,0 +1,120 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from commerce.database import PRAGMAS
+
+
+SCHEMA = [
+    "CREATE TABLE listing (id INTEGER PRIMARY KEY, name TEXT, current_bid REAL, bid_count INTEGER)",
+    "CREATE TABLE bid (id INTEGER PRIMARY KEY, listing_id INTEGER, value REAL)",
+    "CREATE INDEX bid_listing ON bid (listing_id)",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare a mixed read/write workload on SQLite with the stock settings "
+        "(rollback journal, a new connection per request) and with commerce.database's "
+        "tuning (WAL, synchronous=NORMAL, mmap, busy timeout, persistent connections)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=8)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--seconds", type=float, default=5)
+        parser.add_argument("--listings", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as directory:
+            for name, pragmas, persistent in (
+                ("stock", {}, False),
+                # The site sets WAL once, by migrating; on these scratch files every connection may
+                ("tuned", {"journal_mode": "WAL", **PRAGMAS}, True),
+            ):
+                path = Path(directory) / f"{name}.sqlite3"
+                self.create(path, pragmas, options["listings"])
+                reads, writes, errors = self.run(path, pragmas, persistent, options)
+                seconds = options["seconds"]
+                self.stdout.write(
+                    f"{name}: {reads / seconds:.0f} reads/sec, {writes / seconds:.0f} writes/sec, "
+                    f"{errors} 'database is locked' error(s)"
+                )
+
+    def connect(self, path, pragmas):
+        # Django's default SQLite timeout, so "stock" fails the way the site does
+        conn = sqlite3.connect(path, timeout=5, isolation_level=None, check_same_thread=False)
+        for name, value in pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def create(self, path, pragmas, listings):
+        conn = self.connect(path, pragmas)
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.execute("BEGIN")
+        conn.executemany(
+            "INSERT INTO listing (id, name, current_bid, bid_count) VALUES (?, ?, 1, 0)",
+            ((i, f"listing {i}") for i in range(1, listings + 1)),
+        )
+        conn.execute("COMMIT")
+        conn.close()
+
+    def run(self, path, pragmas, persistent, options):
+        listings = options["listings"]
+        deadline = time.perf_counter() + options["seconds"]
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+
+        def read(conn, n):
+            listing_id = n % listings + 1
+            conn.execute("SELECT * FROM listing WHERE id = ?", (listing_id,)).fetchone()
+            conn.execute("SELECT count(*) FROM bid WHERE listing_id = ?", (listing_id,)).fetchone()
+
+        def write(conn, n):
+            # Hot listings: every writer bids on the same ten
+            listing_id = n % 10 + 1
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "UPDATE listing SET current_bid = current_bid + 1, bid_count = bid_count + 1 WHERE id = ?",
+                    (listing_id,),
+                )
+                conn.execute("INSERT INTO bid (listing_id, value) VALUES (?, ?)", (listing_id, n))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        def worker(operation, counter):
+            conn = self.connect(path, pragmas) if persistent else None
+            n = 0
+            while time.perf_counter() < deadline:
+                request_conn = conn or self.connect(path, pragmas)
+                try:
+                    operation(request_conn, n)
+                    key = counter
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    key = "errors"
+                finally:
+                    if not persistent:
+                        request_conn.close()
+                with lock:
+                    counts[key] += 1
+                n += 1
+            if conn:
+                conn.close()
+
+        threads = [threading.Thread(target=worker, args=(read, "reads")) for _ in range(options["readers"])]
+        threads += [threading.Thread(target=worker, args=(write, "writes")) for _ in range(options["writers"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts["reads"], counts["writes"], counts["errors"]
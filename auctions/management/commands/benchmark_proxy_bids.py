@@ -0,0 +1,110 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from auctions.bidding import INCREMENT, place_bid, set_proxy_bid, BidRejected
+from auctions.models import User, Category, AuctionListing, Bid
+
+
+class QueryCounter:
+    """Count queries and writes; unlike the debug query log it has no cap."""
+
+    def __init__(self):
+        self.queries = self.writes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        if sql.startswith(("INSERT", "UPDATE")):
+            self.writes += 1
+        return execute(sql, params, many, context)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the same contested auction twice, once with bidders raising by hand one increment at a time "
+        "and once with each bidder setting a proxy maximum, and compare the writes and time each takes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bidders", type=int, default=20)
+        parser.add_argument("--step", type=Decimal, default=Decimal("25.00"), help="Gap between bidders' maximums")
+
+    def handle(self, *args, **options):
+        # Interleave the maximums so the highest one isn't simply the last to arrive
+        count = options["bidders"]
+        maximums = [Decimal("10.00") + options["step"] * ((i * 7) % count + 1) for i in range(count)]
+
+        category = Category.objects.create(name="benchmark")
+        seller = User.objects.create_user("benchmark-seller")
+        bidders = [User.objects.create_user(f"benchmark-bidder-{i}") for i in range(count)]
+        listings = []
+        try:
+            results = {}
+            for name, run in (("manual", self.run_manual), ("proxy", self.run_proxy)):
+                listing = AuctionListing.objects.create(
+                    name=f"benchmark {name}", description="", current_bid=Decimal("1.00"),
+                    category=category, listed_by=seller
+                )
+                listings.append(listing)
+
+                counter = QueryCounter()
+                with connection.execute_wrapper(counter):
+                    start = time.perf_counter()
+                    run(listing, bidders, maximums)
+                    elapsed = time.perf_counter() - start
+                listing.refresh_from_db()
+                results[name] = (listing, counter.writes, elapsed)
+
+                self.stdout.write(
+                    f"{name}: {Bid.objects.filter(listing=listing).count()} bids, {counter.writes} writes, "
+                    f"{counter.queries} queries in {elapsed * 1000:.1f}ms; "
+                    f"{listing.winning_user.username} wins at {listing.current_bid}"
+                )
+
+            manual, proxy = results["manual"][0], results["proxy"][0]
+            top, runner_up = sorted(maximums, reverse=True)[:2]
+            expected = (bidders[maximums.index(top)].id, min(top, runner_up + INCREMENT))
+            if (proxy.winning_user_id, proxy.current_bid) != expected:
+                raise CommandError(f"Proxy bidding ended at {proxy.current_bid} by user {proxy.winning_user_id}.")
+            if manual.winning_user_id != proxy.winning_user_id:
+                raise CommandError("Manual and proxy bidding picked different winners.")
+            self.stdout.write(self.style.SUCCESS(
+                f"Same winner; proxy bidding used {results['proxy'][1]} writes instead of {results['manual'][1]}."
+            ))
+        finally:
+            for listing in listings:
+                listing.delete()
+            seller.delete()
+            User.objects.filter(id__in=[u.id for u in bidders]).delete()
+            category.delete()
+
+    def run_manual(self, listing, bidders, maximums):
+        # Everyone who is outbid comes back and raises by one increment, until nobody will
+        raised = True
+        while raised:
+            raised = False
+            for bidder, maximum in zip(bidders, maximums):
+                seen = AuctionListing.objects.only(
+                    "id", "is_active", "ends_at", "current_bid", "winning_user", "listed_by"
+                ).get(id=listing.id)
+                value = seen.current_bid + INCREMENT
+                if seen.winning_user_id == bidder.id or value > maximum:
+                    continue
+                try:
+                    place_bid(seen, bidder, value)
+                    raised = True
+                except BidRejected:
+                    pass
+
+    def run_proxy(self, listing, bidders, maximums):
+        for bidder, maximum in zip(bidders, maximums):
+            seen = AuctionListing.objects.only(
+                "id", "is_active", "ends_at", "current_bid", "winning_user", "listed_by"
+            ).get(id=listing.id)
+            try:
+                set_proxy_bid(seen, bidder, maximum)
+            except BidRejected:
+                # Already below the going price
+                pass
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from auctions.ratelimit import TokenBucketLimiter
+
+
+class Command(BaseCommand):
+    help = "Measure the per-request overhead of the token-bucket rate limiter."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100000)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--cache", default="default", help="Cache alias holding the buckets")
+        parser.add_argument("--max-us", type=float, default=0, help="Fail if the median overhead exceeds this many µs")
+
+    def handle(self, *args, **options):
+        n = options["requests"]
+        users = options["users"]
+
+        # A generous limit measures the allowed path; a tiny one the rejected path
+        cases = {
+            "allowed": TokenBucketLimiter("benchmark-allowed", rate=1e9, burst=1e9, cache_alias=options["cache"]),
+            "rejected": TokenBucketLimiter("benchmark-rejected", rate=1e-9, burst=1, cache_alias=options["cache"]),
+        }
+        medians = []
+        for name, limiter in cases.items():
+            timings = []
+            for i in range(n):
+                idents = [f"ip:10.0.{i % users // 256}.{i % 256}", f"user:{i % users}"]
+                start = time.perf_counter()
+                limiter.hit(idents)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            median = timings[n // 2] * 1e6
+            medians.append(median)
+            self.stdout.write(
+                f"{name}: median {median:.1f}µs, p99 {timings[int(n * 0.99)] * 1e6:.1f}µs, "
+                f"mean {sum(timings) / n * 1e6:.1f}µs over {n} requests"
+            )
+
+        if options["max_us"] and max(medians) > options["max_us"]:
+            raise CommandError(f"Median overhead {max(medians):.1f}µs is above {options['max_us']:.1f}µs.")
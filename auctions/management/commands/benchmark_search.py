@@ -0,0 +1,86 @@
+import itertools
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+
+from auctions.models import User, Category, AuctionListing
+from auctions.search import search_listings
+
+
+class Command(BaseCommand):
+    help = "Compare full-text search with icontains scans on a generated catalog."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--listings", type=int, default=1_000_000)
+        parser.add_argument("--queries", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--max-ms", type=float, default=10, help="Fail if the FTS5 median is slower than this")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The full-text index is only used on SQLite.")
+
+        rng = random.Random(options["seed"])
+        # A Zipf-like vocabulary: a few very common words and a long tail of rare ones
+        # Fixed-width words, so prefix matching doesn't widen the synthetic queries
+        vocabulary = [f"w{i:05d}" for i in range(20000)]
+        cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(vocabulary))))
+
+        category = Category.objects.create(name="benchmark")
+        seller = User.objects.create_user("benchmark-seller")
+        try:
+            start = time.perf_counter()
+            created = 0
+            while created < options["listings"]:
+                size = min(options["batch_size"], options["listings"] - created)
+                with transaction.atomic():
+                    AuctionListing.objects.bulk_create([
+                        AuctionListing(
+                            name=" ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=4)),
+                            description=" ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=40)),
+                            current_bid=Decimal("1.00"), category=category, listed_by=seller
+                        )
+                        for _ in range(size)
+                    ])
+                created += size
+            self.stdout.write(f"Inserted and indexed {created} listings in {time.perf_counter() - start:.1f}s")
+
+            terms = [rng.choice(vocabulary[100:5000]) for _ in range(options["queries"])]
+            fts = self.report("FTS5", [self.time(lambda: search_listings(term, category_id=category.id)) for term in terms])
+
+            def icontains(term):
+                return list(
+                    AuctionListing.objects.cards()
+                    .filter(Q(name__icontains=term) | Q(description__icontains=term), category=category, is_active=True)
+                    .order_by("-datetime_submitted", "-id")[:20]
+                )
+            # Scans are slow; a handful of queries is enough to compare
+            self.report("icontains", [self.time(lambda: icontains(term)) for term in terms[:5]])
+
+            if fts > options["max_ms"]:
+                raise CommandError(f"FTS5 median {fts:.2f}ms is above {options['max_ms']}ms.")
+        finally:
+            # Raw deletes: the ORM would collect a million rows in Python first
+            with connection.cursor() as cursor:
+                cursor.execute("DELETE FROM auctions_auctionlisting WHERE category_id = %s", [category.id])
+            seller.delete()
+            category.delete()
+
+    def time(self, query):
+        start = time.perf_counter()
+        query()
+        return (time.perf_counter() - start) * 1000
+
+    def report(self, name, timings):
+        timings.sort()
+        median = statistics.median(timings)
+        self.stdout.write(
+            f"{name}: median {median:.2f}ms, max {timings[-1]:.2f}ms over {len(timings)} queries"
+        )
+        return median
@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from auctions.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Request the index and categories pages anonymously and signed in under each session engine, "
+        "with and without the user cache, and report the queries and time per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per configuration")
+
+    def handle(self, *args, **options):
+        count = options["requests"]
+        paths = [reverse("index"), reverse("categories")]
+        user = User.objects.create_user("benchmark-sessions")
+        override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]).enable()
+
+        try:
+            for session in settings.SESSION_ENGINES:
+                for user_cache in (0, 300):
+                    with override_settings(
+                        SESSION_ENGINE=settings.SESSION_ENGINES[session], USER_CACHE_TIMEOUT=user_cache
+                    ):
+                        for signed_in in (False, True):
+                            queries, elapsed = self.run(user if signed_in else None, paths, count)
+                            self.stdout.write(
+                                f"{session:<15} user cache {'on ' if user_cache else 'off'}  "
+                                f"{'signed in' if signed_in else 'anonymous':<10} "
+                                f"{queries / count:.2f} queries/request, {elapsed / count * 1000:.2f}ms/request"
+                            )
+        finally:
+            user.delete()
+
+    def run(self, user, paths, count):
+        client = Client()
+        if user:
+            client.force_login(user)
+        # Warm the fragment, category and user caches so only the per-request work is left
+        for path in paths:
+            client.get(path)
+
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            for i in range(count):
+                client.get(paths[i % len(paths)])
+            elapsed = time.perf_counter() - start
+        if user:
+            client.logout()
+        return len(ctx.captured_queries), elapsed
@@ -0,0 +1,94 @@
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template.backends.django import DjangoTemplates
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from auctions.forms import CategoryFilterForm
+from auctions.models import AuctionListing, Category
+
+
+LOADS = 200
+LOADERS = ["django.template.loaders.filesystem.Loader", "django.template.loaders.app_directories.Loader"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load and render the listing feeds with a large page of cards through the uncached and the cached "
+        "template loader, and report the load time and pages and cards per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cards", type=int, default=1000, help="Cards per page")
+        parser.add_argument("--pages", type=int, default=20, help="Renders per feed and loader; the best one counts")
+        parser.add_argument(
+            "--fragment-cache", action="store_true",
+            help="Keep the card fragment cache on (by default every card is rendered from scratch)"
+        )
+
+    def handle(self, *args, **options):
+        cards, pages = options["cards"], options["pages"]
+        now = timezone.now()
+        category = Category(id=1, name="Benchmark")
+        listings = []
+        for i in range(cards):
+            listing = AuctionListing(
+                id=i + 1, name=f"Listing {i}", current_bid=Decimal(10 + i), photo="listings/comics.jpg",
+                datetime_submitted=now, is_active=i % 5 != 0, ends_at=now if i % 2 else None
+            )
+            listing.summary = "A listing " * 30
+            listing.cache_version = 1
+            listings.append(listing)
+
+        feeds = {
+            "auctions/index.html": {"listings": listings, "watched": {listing.id for listing in listings[::3]}},
+            "auctions/category_matches.html": {
+                "category": category, "form": CategoryFilterForm({}), "listings": listings,
+                "watched": set(), "next_query": "after=abc"
+            },
+            "auctions/watchlist.html": {"watchlist": listings, "next_cursor": "abc"},
+        }
+        feeds["auctions/category_matches.html"]["form"].is_valid()
+
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+        if not options["fragment_cache"]:
+            override_settings(CACHES={
+                **settings.CACHES,
+                "template_fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+            }).enable()
+
+        template_options = {
+            key: value for key, value in settings.TEMPLATES[0].get("OPTIONS", {}).items() if key != "loaders"
+        }
+        for label, loaders in (
+            ("uncached loader", LOADERS),
+            ("cached loader", [("django.template.loaders.cached.Loader", LOADERS)]),
+        ):
+            backend = DjangoTemplates({
+                "NAME": "benchmark", "DIRS": settings.TEMPLATES[0]["DIRS"], "APP_DIRS": False,
+                "OPTIONS": {**template_options, "loaders": loaders},
+            })
+            for template_name, context in feeds.items():
+                # Loading is what the cached loader saves; time it on its own
+                start = time.perf_counter()
+                for _ in range(LOADS):
+                    backend.get_template(template_name)
+                load = (time.perf_counter() - start) / LOADS
+
+                # Best of `pages` full renders, as a view does them, to keep noise out
+                timings = []
+                for _ in range(pages):
+                    start = time.perf_counter()
+                    backend.get_template(template_name).render(context, request)
+                    timings.append(time.perf_counter() - start)
+                best = min(timings)
+                self.stdout.write(
+                    f"{label}, {template_name}: load {load * 1e6:.0f}us, "
+                    f"page {best * 1000:.0f}ms ({1 / best:.2f} pages/s, {cards / best:.0f} cards/s)"
+                )
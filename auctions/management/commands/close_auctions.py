@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from auctions.closing import close_due_auctions, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Close auctions whose end time has passed. Use --loop to keep running as a worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running, checking every --interval seconds")
+        parser.add_argument("--interval", type=float, default=5)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            closed = close_due_auctions(batch_size=options["batch_size"])
+            if closed or not options["loop"]:
+                self.stdout.write(f"Closed {closed} auction(s).")
+            if not options["loop"]:
+                return
+
+            # Don't hold a connection open between runs
+            close_old_connections()
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,56 @@
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand
+
+from auctions.models import AuctionListing
+
+
+FIELDS = ["name", "description", "current_bid", "category", "listed_by", "photo", "ends_at", "is_active"]
+
+
+class Command(BaseCommand):
+    help = "Export listings as CSV or JSON Lines, in the format import_listings reads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to write, or - for standard output")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--active", action="store_true", help="Only export active listings")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or ("jsonl" if options["path"].endswith((".jsonl", ".json")) else "csv")
+        listings = AuctionListing.objects.order_by("id")
+        if options["active"]:
+            listings = listings.filter(is_active=True)
+        rows = listings.values_list(
+            "name", "description", "current_bid", "category__name", "listed_by__username",
+            "photo", "ends_at", "is_active"
+        ).iterator(chunk_size=options["chunk_size"])
+
+        target = sys.stdout if options["path"] == "-" else open(options["path"], "w", newline="", encoding="utf-8")
+        exported = 0
+        try:
+            if fmt == "csv":
+                writer = csv.writer(target)
+                writer.writerow(FIELDS)
+                for row in rows:
+                    writer.writerow(self.clean(row))
+                    exported += 1
+            else:
+                for row in rows:
+                    target.write(json.dumps(dict(zip(FIELDS, self.clean(row)))) + "\n")
+                    exported += 1
+        finally:
+            if target is not sys.stdout:
+                target.close()
+
+        self.stderr.write(f"Exported {exported} listing(s).")
+
+    def clean(self, row):
+        name, description, current_bid, category, listed_by, photo, ends_at, is_active = row
+        return [
+            name, description, str(current_bid), category, listed_by,
+            photo or "", ends_at.isoformat() if ends_at else "", is_active
+        ]
@@ -0,0 +1,161 @@
+import csv
+import json
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from auctions.caching import invalidate_category_summaries
+from auctions.models import User, Category, AuctionListing
+from auctions.thumbnails import make_thumbnails
+
+
+BOOLEANS = {"true": True, "1": True, "yes": True, "false": False, "0": False, "no": False}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import listings from a CSV or JSON Lines file with the columns "
+        "name, description, current_bid, category, listed_by and optionally photo, ends_at, is_active."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to read, or - for standard input")
+        parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--photos-dir", type=Path,
+            help="Directory to copy photos with relative paths from. Without it they must already be in media storage."
+        )
+        parser.add_argument("--create-categories", action="store_true", help="Create categories that don't exist")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or ("jsonl" if options["path"].endswith((".jsonl", ".json")) else "csv")
+        self.photos_dir = options["photos_dir"]
+        self.create_categories = options["create_categories"]
+        # Natural key -> id, filled on first use
+        self.categories = {}
+        self.users = {}
+
+        source = sys.stdin if options["path"] == "-" else open(options["path"], newline="", encoding="utf-8")
+        start = time.perf_counter()
+        imported = skipped = 0
+        try:
+            batch = []
+            for line, row in enumerate(self.rows(source, fmt), start=1):
+                try:
+                    batch.append(self.build(row))
+                except KeyError as e:
+                    self.stderr.write(f"Row {line} skipped: missing column {e}")
+                    skipped += 1
+                    continue
+                except (ValueError, InvalidOperation) as e:
+                    self.stderr.write(f"Row {line} skipped: {e}")
+                    skipped += 1
+                    continue
+                if len(batch) >= options["batch_size"]:
+                    imported += self.insert(batch)
+                    batch = []
+            imported += self.insert(batch)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        # bulk_create skips the signals that normally do this
+        invalidate_category_summaries()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} listing(s), skipped {skipped}, in {elapsed:.1f}s "
+            f"({imported / elapsed if elapsed else 0:.0f} rows/sec)."
+        ))
+
+    def rows(self, source, fmt):
+        if fmt == "csv":
+            yield from csv.DictReader(source)
+        else:
+            for line in source:
+                if not line.strip():
+                    continue
+                # A bad line is handed on as the error, for handle() to skip like any other bad row
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = ValueError(f"invalid JSON ({e.msg} at column {e.colno})")
+                else:
+                    if not isinstance(row, dict):
+                        row = ValueError("not a JSON object")
+                yield row
+
+    def build(self, row):
+        if isinstance(row, ValueError):
+            raise row
+        listing = AuctionListing(
+            name=row["name"],
+            description=row.get("description") or "",
+            current_bid=Decimal(str(row["current_bid"])),
+            category_id=self.category_id(row["category"]),
+            listed_by_id=self.user_id(row["listed_by"]),
+        )
+        if row.get("ends_at"):
+            listing.ends_at = parse_datetime(row["ends_at"])
+            if listing.ends_at is None:
+                raise ValueError(f"invalid ends_at {row['ends_at']!r}")
+        if row.get("is_active") not in (None, ""):
+            listing.is_active = self.boolean(row["is_active"], "is_active")
+        if row.get("photo"):
+            listing.photo = self.copy_photo(row["photo"])
+        return listing
+
+    def boolean(self, value, column):
+        # JSON Lines has real booleans; CSV has the "True"/"False" export_listings writes
+        if isinstance(value, bool):
+            return value
+        try:
+            return BOOLEANS[str(value).strip().lower()]
+        except KeyError:
+            raise ValueError(f"invalid {column} {value!r}")
+
+    def category_id(self, name):
+        if name not in self.categories:
+            category = Category.objects.filter(name=name).only("id").first()
+            if category is None:
+                if not self.create_categories:
+                    raise ValueError(f"unknown category {name!r}")
+                category = Category.objects.create(name=name)
+            self.categories[name] = category.id
+        return self.categories[name]
+
+    def user_id(self, username):
+        if username not in self.users:
+            user_id = User.objects.filter(username=username).values_list("id", flat=True).first()
+            if user_id is None:
+                raise ValueError(f"unknown user {username!r}")
+            self.users[username] = user_id
+        return self.users[username]
+
+    def copy_photo(self, photo):
+        """Copy a photo file into media storage, or attach one that is already there (as exported)."""
+        field = AuctionListing._meta.get_field("photo")
+        path = Path(photo)
+        if not path.is_absolute():
+            if self.photos_dir is None:
+                if not field.storage.exists(photo):
+                    raise ValueError(f"photo {photo!r} is not in media storage; pass --photos-dir to copy it")
+                return photo
+            path = self.photos_dir / path
+
+        with open(path, "rb") as f:
+            name = field.storage.save(field.generate_filename(None, path.name), File(f))
+        make_thumbnails(field.attr_class(None, field, name), force=True)
+        return name
+
+    def insert(self, batch):
+        if batch:
+            with transaction.atomic():
+                AuctionListing.objects.bulk_create(batch)
+        return len(batch)
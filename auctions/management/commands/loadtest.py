@@ -0,0 +1,162 @@
+import http.cookiejar
+import random
+import statistics
+import threading
+import time
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import resolve, reverse
+
+from auctions.models import User, Category, AuctionListing
+
+from .seed_data import PASSWORD
+
+
+class InProcessSession:
+    """Requests through Django's test client, counting queries per request."""
+
+    counts_queries = True
+
+    def __init__(self, user):
+        self.client = Client(HTTP_HOST="localhost")
+        self.client.force_login(user)
+
+    def request(self, method, path, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(path, data)
+        return response.status_code, len(ctx.captured_queries)
+
+
+class HttpSession:
+    """Requests over HTTP to a running server, e.g. manage.py runserver."""
+
+    counts_queries = False
+
+    def __init__(self, user, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.request("get", reverse("login"))
+        status, _ = self.request("post", reverse("login"), {"username": user.username, "password": PASSWORD})
+        if status >= 400:
+            raise CommandError(f"Could not log in as {user.username}.")
+
+    def request(self, method, path, data=None):
+        url = self.base_url + path
+        headers = {}
+        body = None
+        if method == "post":
+            token = next((c.value for c in self.cookies if c.name == "csrftoken"), "")
+            body = urllib.parse.urlencode({**(data or {}), "csrfmiddlewaretoken": token}).encode()
+            headers = {"X-CSRFToken": token, "Referer": url}
+        elif data:
+            url += "?" + urllib.parse.urlencode(data)
+        try:
+            with self.opener.open(urllib.request.Request(url, body, headers)) as response:
+                response.read()
+                return response.status, None
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a browse/bid/comment mix against the site as the users created by seed_data, "
+        "and report latency percentiles (and queries per request, in process) by route."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000, help="Requests per worker")
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--url", help="Base URL of a running server; by default requests go through the WSGI app in process")
+        parser.add_argument("--prefix", default="seed", help="Username prefix used by seed_data")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--rate-limits", action="store_true",
+            help="Keep RATE_LIMITS on in process, where every request shares one client IP"
+        )
+
+    def handle(self, *args, **options):
+        if not options["url"] and not options["rate_limits"]:
+            override_settings(RATE_LIMITS={}).enable()
+
+        users = list(User.objects.filter(username__startswith=f"{options['prefix']}-")[:max(options["concurrency"], 50)])
+        listing_ids = list(AuctionListing.objects.filter(is_active=True).values_list("id", flat=True)[:5000])
+        category_ids = list(Category.objects.values_list("id", flat=True))
+        if not users or not listing_ids:
+            raise CommandError("Nothing to test against; run seed_data first.")
+
+        latencies = defaultdict(list)
+        queries = defaultdict(list)
+        errors = defaultdict(int)
+        lock = threading.Lock()
+
+        def worker(n):
+            rng = random.Random(options["seed"] + n)
+            user = users[n % len(users)]
+            session = HttpSession(user, options["url"]) if options["url"] else InProcessSession(user)
+
+            for _ in range(options["requests"]):
+                method, path, data = self.next_request(rng, listing_ids, category_ids)
+                start = time.perf_counter()
+                status, query_count = session.request(method, path, data)
+                elapsed = (time.perf_counter() - start) * 1000
+
+                route = resolve(path).url_name
+                with lock:
+                    latencies[route].append(elapsed)
+                    if query_count is not None:
+                        queries[route].append(query_count)
+                    if status >= 400:
+                        errors[route] += 1
+            connection.close()
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(options["concurrency"])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        total = sum(len(timings) for timings in latencies.values())
+        self.stdout.write(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.0f} req/s)\n")
+        self.stdout.write(f"{'route':<18}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+        for route in sorted(latencies):
+            timings = sorted(latencies[route])
+            mean_queries = f"{statistics.mean(queries[route]):.1f}" if queries[route] else "-"
+            self.stdout.write(
+                f"{route:<18}{len(timings):>7}{self.percentile(timings, 50):>9.1f}{self.percentile(timings, 95):>9.1f}"
+                f"{self.percentile(timings, 99):>9.1f}{mean_queries:>9}{errors[route]:>8}"
+            )
+
+    def next_request(self, rng, listing_ids, category_ids):
+        listing_id = rng.choice(listing_ids)
+        roll = rng.random()
+        if roll < 0.25:
+            return "get", reverse("index"), None
+        if roll < 0.35:
+            return "get", reverse("categories"), None
+        if roll < 0.50:
+            return "get", reverse("category_matches", args=[rng.choice(category_ids)]), None
+        if roll < 0.75:
+            return "get", reverse("listing_details", args=[listing_id]), None
+        if roll < 0.80:
+            return "get", reverse("search"), {"q": rng.choice(["listing", "generated", "number 1"])}
+        if roll < 0.83:
+            return "get", reverse("watchlist"), None
+        if roll < 0.93:
+            current = AuctionListing.objects.values_list("current_bid", flat=True).get(id=listing_id)
+            return "post", reverse("bid", args=[listing_id]), {"value": current + rng.randint(1, 10)}
+        if roll < 0.98:
+            return "post", reverse("comment", args=[listing_id]), {"content": "Load test comment"}
+        return "post", reverse("toggle_watchlist", args=[listing_id]), None
+
+    def percentile(self, timings, p):
+        return timings[min(len(timings) - 1, int(len(timings) * p / 100))]
@@ -0,0 +1,97 @@
+import asyncio
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from auctions.events import get_broker
+from auctions.models import User, Category, AuctionListing
+
+
+class Command(BaseCommand):
+    help = (
+        "Open many idle event streams on one listing through the ASGI application, "
+        "publish a bid and measure fan-out latency and memory per subscriber."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--subscribers", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        category = Category.objects.create(name="loadtest")
+        seller = User.objects.create_user("loadtest-seller")
+        listing = AuctionListing.objects.create(
+            name="loadtest", description="", current_bid=Decimal("1.00"), category=category, listed_by=seller
+        )
+        try:
+            asyncio.run(self.run(listing.id, options["subscribers"]))
+        finally:
+            listing.delete()
+            seller.delete()
+            category.delete()
+
+    async def run(self, listing_id, count):
+        app = ASGIHandler()
+        broker = get_broker()
+        path = reverse("listing_events", args=[listing_id])
+        received = asyncio.Event()
+        pending = count
+
+        async def client():
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+                "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+                "headers": [(b"host", b"localhost")], "client": ("127.0.0.1", 0), "server": ("localhost", 80),
+            }
+            disconnect = asyncio.Event()
+
+            async def receive():
+                if not disconnect.is_set():
+                    disconnect.set()
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await asyncio.Future()
+
+            async def send(message):
+                nonlocal pending
+                if message["type"] == "http.response.body" and b"event: bid" in message.get("body", b""):
+                    pending -= 1
+                    if pending == 0:
+                        received.set()
+
+            await app(scope, receive, send)
+
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(client()) for _ in range(count)]
+        while broker.subscriber_count(listing_id) < count:
+            if any(task.done() for task in tasks):
+                # Surface the error of a stream that ended early
+                for task in tasks:
+                    if task.done():
+                        task.result()
+                raise CommandError("A stream ended before the test started.")
+            await asyncio.sleep(0.05)
+        connected = time.perf_counter() - start
+        per_subscriber = (tracemalloc.get_traced_memory()[0] - before) / count
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        broker.publish(listing_id, {"type": "bid", "current_bid": "2.00", "bid_count": 1, "winning_user": "loadtest"})
+        await asyncio.wait_for(received.wait(), 30)
+        fanout = time.perf_counter() - start
+
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self.stdout.write(
+            f"{count} subscribers connected in {connected:.2f}s, "
+            f"~{per_subscriber / 1024:.1f} KiB each; one bid reached all of them in {fanout * 1000:.1f}ms"
+        )
+        if broker.subscriber_count(listing_id):
+            raise CommandError(f"{broker.subscriber_count(listing_id)} subscription(s) leaked.")
+        self.stdout.write(self.style.SUCCESS("All subscriptions were released."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from auctions.search import install_fts
+
+
+class Command(BaseCommand):
+    help = "Recreate the listing full-text index and its triggers, and reindex every listing."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The full-text index is only used on SQLite.")
+        with transaction.atomic(), connection.cursor() as cursor:
+            install_fts(cursor)
+        self.stdout.write(self.style.SUCCESS("Rebuilt the listing search index."))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Now
+
+from auctions.auth import invalidate_user
+from auctions.models import AuctionListing, Comment, User, Watchlist
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute comment_count on every listing from its Comment rows and watchlist_count on every user "
+        "from their Watchlist rows."
+    )
+
+    def handle(self, *args, **options):
+        comments = (
+            Comment.objects.filter(listing=OuterRef("pk")).order_by().values("listing")
+            .annotate(n=Count("id")).values("n")
+        )
+        watched = (
+            Watchlist.objects.filter(user=OuterRef("pk")).order_by().values("user")
+            .annotate(n=Count("id")).values("n")
+        )
+
+        with transaction.atomic():
+            updated = AuctionListing.objects.update(
+                comment_count=Coalesce(Subquery(comments), Value(0)),
+                updated_at=Now(),
+            )
+            # Only users whose count is off, so only their cached copies need dropping
+            stale = list(
+                User.objects.annotate(watched=Coalesce(Subquery(watched), Value(0)))
+                .exclude(watchlist_count=F("watched")).values_list("id", "watched")
+            )
+            for user_id, count in stale:
+                User.objects.filter(id=user_id).update(watchlist_count=count)
+                invalidate_user(user_id)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Recounted the comments of {updated} listing(s) and fixed the watchlist count of {len(stale)} user(s)."
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from auctions.models import AuctionListing, Category
+from auctions.thumbnails import make_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails for listing and category photos already in MEDIA_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Regenerate thumbnails that already exist")
+
+    def handle(self, *args, **options):
+        photos = written = 0
+        for model in (AuctionListing, Category):
+            names = (
+                model.objects.exclude(photo="").exclude(photo__isnull=True)
+                .order_by().values_list("photo", flat=True).distinct()
+            )
+            field = model._meta.get_field("photo")
+            for name in names.iterator():
+                if not field.storage.exists(name):
+                    self.stderr.write(f"Missing file: {name}")
+                    continue
+                written += make_thumbnails(field.attr_class(None, field, name), force=options["force"])
+                photos += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} thumbnail(s) for {photos} photo(s)."))
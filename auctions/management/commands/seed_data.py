@@ -0,0 +1,138 @@
+import itertools
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+from PIL import Image
+
+from auctions.models import User, Category, AuctionListing, Bid, Comment, Watchlist
+from auctions.thumbnails import make_thumbnails
+
+
+PASSWORD = "password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic catalog: users, categories and listings with photos, and "
+        f"bids, comments and watchlist entries concentrated on a few popular listings. "
+        f"Every generated user's password is {PASSWORD!r}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=12)
+        parser.add_argument("--listings", type=int, default=10000)
+        parser.add_argument("--bids", type=int, default=100000)
+        parser.add_argument("--comments", type=int, default=30000)
+        parser.add_argument("--watchlist", type=int, default=20000)
+        parser.add_argument("--photos", type=int, default=20, help="Distinct generated photos shared by the listings")
+        parser.add_argument("--alpha", type=float, default=1.1, help="Power-law exponent of listing popularity")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--prefix", default="seed", help="Prefix of generated usernames and category names")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        prefix = options["prefix"]
+        start = time.perf_counter()
+
+        password = make_password(PASSWORD)
+        users = self.bulk(User, (
+            User(username=f"{prefix}-user{i}", password=password) for i in range(options["users"])
+        ))
+        self.log("users", users, start)
+
+        photos = [self.photo(i) for i in range(options["photos"])]
+        categories = self.bulk(Category, (
+            Category(name=f"{prefix} category {i}", photo=photos[i % len(photos)]) for i in range(options["categories"])
+        ))
+        self.log("categories", categories, start)
+
+        now = timezone.now()
+        listings = self.bulk(AuctionListing, (
+            AuctionListing(
+                name=f"{prefix} listing {i}",
+                description=f"Generated listing number {i}. " * self.rng.randint(1, 20),
+                current_bid=Decimal(self.rng.randint(1, 500)),
+                photo=self.rng.choice(photos),
+                category=self.rng.choice(categories),
+                listed_by=self.rng.choice(users),
+                ends_at=now + timedelta(hours=self.rng.randint(1, 24 * 14)) if self.rng.random() < 0.5 else None,
+            )
+            for i in range(options["listings"])
+        ))
+        self.log("listings", listings, start)
+
+        # Listing i is picked with probability proportional to 1 / (i + 1)^alpha
+        popular = list(listings)
+        self.rng.shuffle(popular)
+        cum_weights = list(itertools.accumulate(1 / (i + 1) ** options["alpha"] for i in range(len(popular))))
+
+        def pick():
+            return self.rng.choices(popular, cum_weights=cum_weights)[0]
+
+        prices = {listing.id: listing.current_bid for listing in listings}
+
+        def bid():
+            listing = pick()
+            prices[listing.id] += Decimal(self.rng.randint(1, 20))
+            return Bid(user=self.rng.choice(users), listing=listing, value=prices[listing.id])
+
+        self.log("bids", self.bulk(Bid, (bid() for _ in range(options["bids"])), keep=False), start)
+        self.log("comments", self.bulk(Comment, (
+            Comment(user=self.rng.choice(users), listing=pick(), content=f"Generated comment {i}")
+            for i in range(options["comments"])
+        ), keep=False), start)
+        watched = {(self.rng.choice(users).id, pick().id) for _ in range(options["watchlist"])}
+        self.log("watchlist entries", self.bulk(Watchlist, (
+            Watchlist(user_id=user_id, listing_id=listing_id) for user_id, listing_id in watched
+        ), keep=False), start)
+
+        # Bring prices, winners, the bid summary and the counters in line with the generated bids
+        top = Bid.objects.filter(listing=OuterRef("pk")).order_by("-value", "id")
+        with transaction.atomic():
+            AuctionListing.objects.filter(category__in=categories).exclude(bid=None).update(
+                current_bid=Subquery(top.values("value")[:1]),
+                winning_user=Subquery(top.values("user")[:1]),
+            )
+        call_command("backfill_bid_summary", stdout=self.stdout)
+        call_command("recount_counters", stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - start:.1f}s."))
+
+    def bulk(self, model, objects, keep=True):
+        """bulk_create `objects` in batches; return the created objects, or their count with keep=False."""
+        created = [] if keep else 0
+        while True:
+            batch = list(itertools.islice(objects, self.batch_size))
+            if not batch:
+                return created
+            with transaction.atomic():
+                batch = model.objects.bulk_create(batch)
+            if keep:
+                created.extend(batch)
+            else:
+                created += len(batch)
+
+    def photo(self, i):
+        field = AuctionListing._meta.get_field("photo")
+        buffer = BytesIO()
+        color = tuple(self.rng.randrange(256) for _ in range(3))
+        Image.new("RGB", (800, 600), color).save(buffer, "JPEG")
+        name = field.storage.save(field.generate_filename(None, f"seed-{i}.jpg"), ContentFile(buffer.getvalue()))
+        make_thumbnails(field.attr_class(None, field, name), force=True)
+        return name
+
+    def log(self, label, created, start):
+        count = created if isinstance(created, int) else len(created)
+        self.stdout.write(f"{count} {label} ({time.perf_counter() - start:.1f}s)")
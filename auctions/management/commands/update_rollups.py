@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from auctions.analytics import update_rollups, BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Fold bids placed since the last run into the analytics rollups. Use --loop to keep running as a worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running, checking every --interval seconds")
+        parser.add_argument("--interval", type=float, default=60)
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        while True:
+            start = time.perf_counter()
+            processed = update_rollups(batch_size=options["batch_size"])
+            if processed or not options["loop"]:
+                self.stdout.write(f"Rolled up {processed} bid(s) in {time.perf_counter() - start:.2f}s.")
+            if not options["loop"]:
+                return
+
+            # Don't hold a connection open between runs
+            close_old_connections()
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,71 @@
+import time
+from contextlib import ExitStack
+
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db import connections
+from django.utils.functional import SimpleLazyObject
+
+from . import auth
+from .performance import RequestMetrics, SLOW_REQUEST_MS, histograms, logger, record_query
+
+
+def _get_user(request):
+    if not hasattr(request, "_cached_user"):
+        request._cached_user = auth.get_user(request)
+    return request._cached_user
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    AuthenticationMiddleware that loads request.user through auctions.auth,
+    from the cache when USER_CACHE_TIMEOUT is set. Like Django's, nothing is
+    loaded until a view or template touches request.user.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        request.user = SimpleLazyObject(lambda: _get_user(request))
+
+
+class PerformanceMiddleware:
+    """
+    Time every request and its database and template work (see auctions.performance).
+
+    Opt-in: settings.py only installs it when AUCTIONS_PERFORMANCE=1. Place it
+    first in MIDDLEWARE so the timings cover the other middleware too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = metrics.activate()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(record_query))
+                response = self.get_response(request)
+        finally:
+            RequestMetrics.deactivate(token)
+
+        total_ms = (time.perf_counter() - metrics.start) * 1000
+        db_ms = metrics.db_time * 1000
+        template_ms = metrics.template_time * 1000
+        size = 0 if response.streaming else len(response.content)
+        match = request.resolver_match
+        view = match.view_name if match else "<unresolved>"
+
+        response["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{metrics.queries} queries", '
+            f"tpl;dur={template_ms:.1f}, total;dur={total_ms:.1f}"
+        )
+        histograms.record(view, total_ms, metrics, size)
+
+        if total_ms >= SLOW_REQUEST_MS:
+            logger.warning(
+                "Slow request: %s %s (%s) took %.0fms, %d queries in %.0fms, templates %.0fms, %d bytes\n%s",
+                request.method, request.path, view, total_ms, metrics.queries, db_ms, template_ms, size,
+                "\n".join(f"  {elapsed * 1000:.1f}ms {sql}" for elapsed, sql in metrics.sql),
+            )
+        return response
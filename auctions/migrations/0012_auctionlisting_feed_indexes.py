@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0011_auctionlisting_bid_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auctionlisting',
+            index=models.Index(fields=['is_active', 'datetime_submitted'], name='auctions_au_is_acti_23399d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auctionlisting',
+            index=models.Index(fields=['category', 'is_active', 'datetime_submitted'], name='auctions_au_categor_1e79b6_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:14
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_watchlist_items(apps, schema_editor):
+    Watchlist = apps.get_model('auctions', 'Watchlist')
+    keep = (
+        Watchlist.objects.values('user', 'listing')
+        .annotate(keep_id=Min('id'))
+        .values_list('keep_id', flat=True)
+    )
+    Watchlist.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0012_auctionlisting_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auctionlisting',
+            name='auctions_au_is_acti_23399d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auctionlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-datetime_submitted', '-id'], name='active_listing_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['listing', '-value'], name='bid_listing_value_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['listing', 'datetime_submitted'], name='comment_listing_time_idx'),
+        ),
+        migrations.RunPython(remove_duplicate_watchlist_items, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='watchlist',
+            constraint=models.UniqueConstraint(fields=('user', 'listing'), name='unique_watchlist_user_listing'),
+        ),
+    ]
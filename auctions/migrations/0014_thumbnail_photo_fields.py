@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:16
+
+import auctions.thumbnails
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0013_hot_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auctionlisting',
+            name='photo',
+            field=auctions.thumbnails.ThumbnailImageField(blank=True, null=True, upload_to='listings/'),
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='photo',
+            field=auctions.thumbnails.ThumbnailImageField(blank=True, null=True, upload_to='categories/'),
+        ),
+    ]
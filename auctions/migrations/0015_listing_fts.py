@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    # Other databases use the icontains fallback in auctions.search
+    if schema_editor.connection.vendor == 'sqlite':
+        from auctions.search import install_fts
+        with schema_editor.connection.cursor() as cursor:
+            install_fts(cursor)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        from auctions.search import uninstall_fts
+        with schema_editor.connection.cursor() as cursor:
+            uninstall_fts(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0014_thumbnail_photo_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
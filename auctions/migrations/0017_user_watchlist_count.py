@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:43
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_watchlists(apps, schema_editor):
+    User = apps.get_model('auctions', 'User')
+    Watchlist = apps.get_model('auctions', 'Watchlist')
+    counts = Watchlist.objects.filter(user=OuterRef('pk')).order_by().values('user').annotate(n=Count('id')).values('n')
+    User.objects.update(watchlist_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0016_auctionlisting_ends_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='watchlist_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_watchlists, migrations.RunPython.noop),
+    ]
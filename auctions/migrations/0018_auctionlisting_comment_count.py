@@ -0,0 +1,39 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:46
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_comments(apps, schema_editor):
+    AuctionListing = apps.get_model('auctions', 'AuctionListing')
+    Comment = apps.get_model('auctions', 'Comment')
+    counts = Comment.objects.filter(listing=OuterRef('pk')).order_by().values('listing').annotate(n=Count('id')).values('n')
+    AuctionListing.objects.update(comment_count=Coalesce(Subquery(counts), Value(0)))
+
+
+def reinstall_fts(apps, schema_editor):
+    # Adding the column rebuilds auctions_auctionlisting, which drops the FTS triggers
+    if schema_editor.connection.vendor == 'sqlite':
+        from auctions.search import install_fts
+        with schema_editor.connection.cursor() as cursor:
+            install_fts(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0017_user_watchlist_count'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after RemoveField has rebuilt the table again
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fts),
+        migrations.AddField(
+            model_name='auctionlisting',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+        migrations.RunPython(count_comments, migrations.RunPython.noop),
+    ]
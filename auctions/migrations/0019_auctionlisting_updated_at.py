@@ -0,0 +1,38 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:48
+
+from django.db import migrations, models
+from django.db.models import F
+from django.db.models.functions import Coalesce
+
+
+def backfill(apps, schema_editor):
+    # Best known time of the last change, rather than the time of the migration
+    AuctionListing = apps.get_model('auctions', 'AuctionListing')
+    AuctionListing.objects.update(updated_at=Coalesce(F('last_bid_at'), F('datetime_submitted')))
+
+
+def reinstall_fts(apps, schema_editor):
+    # Adding the column rebuilds auctions_auctionlisting, which drops the FTS triggers
+    if schema_editor.connection.vendor == 'sqlite':
+        from auctions.search import install_fts
+        with schema_editor.connection.cursor() as cursor:
+            install_fts(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0018_auctionlisting_comment_count'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after RemoveField has rebuilt the table again
+        migrations.RunPython(migrations.RunPython.noop, reinstall_fts),
+        migrations.AddField(
+            model_name='auctionlisting',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(reinstall_fts, migrations.RunPython.noop),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
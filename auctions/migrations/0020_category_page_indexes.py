@@ -0,0 +1,29 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0019_auctionlisting_updated_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='auctionlisting',
+            name='auctions_au_categor_1e79b6_idx',
+        ),
+        migrations.AddIndex(
+            model_name='auctionlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-datetime_submitted', '-id'], name='active_category_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auctionlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'current_bid', 'id'], name='active_category_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auctionlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'ends_at', 'id'], name='active_category_ends_idx'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.30 on 2026-10-18 04:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0020_category_page_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_bid_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CategoryDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('bid_count', models.PositiveIntegerField()),
+                ('gmv', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='auctions.category')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ListingPriceHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('low', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('bid_count', models.PositiveIntegerField()),
+                ('listing', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_history', to='auctions.auctionlisting')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='price_history_hour_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='listingpricehistory',
+            constraint=models.UniqueConstraint(fields=('listing', 'hour'), name='unique_price_history_listing_hour'),
+        ),
+        migrations.AddConstraint(
+            model_name='categorydailystats',
+            constraint=models.UniqueConstraint(fields=('day', 'category'), name='unique_daily_stats_day_category'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-18 05:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auctions', '0022_proxy_bids'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='categorydailystats',
+            old_name='gmv',
+            new_name='bid_value',
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+def use_wal(apps, schema_editor):
+    # Stored in the database file, so this lasts; see commerce.database
+    from commerce.database import enable_wal
+    enable_wal(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    # SQLite refuses to change the journal mode inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('auctions', '0023_rename_gmv_bid_value'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_wal, migrations.RunPython.noop),
+    ]
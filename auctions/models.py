@@ -1,30 +1,83 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Substr
+
+from .thumbnails import ThumbnailImageField
 
 
 class User(AbstractUser):
-    pass
+    # Maintained by auctions.watchlists so the nav bar needs no query
+    watchlist_count = models.PositiveIntegerField(default=0)
 
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
-    photo = models.ImageField(upload_to='categories/', null=True, blank=True)
+    photo = ThumbnailImageField(upload_to='categories/', null=True, blank=True)
 
     def __str__(self):
         return self.name
 
 
+class AuctionListingQuerySet(models.QuerySet):
+    def cards(self):
+        """Only the columns a listing card shows, with a short `summary` instead of the full description."""
+        return self.only(
+            "id", "name", "current_bid", "photo", "datetime_submitted", "is_active", "ends_at"
+        # One character more than the cards display, so truncatechars knows when to add an ellipsis
+        ).annotate(summary=Substr("description", 1, 301))
+
+
 class AuctionListing(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField()
     current_bid = models.DecimalField(max_digits=10, decimal_places=2) 
-    photo = models.ImageField(upload_to='listings/', null=True, blank=True)
+    photo = ThumbnailImageField(upload_to='listings/', null=True, blank=True)
     datetime_submitted = models.DateTimeField(auto_now_add=True)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     listed_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name="listings")
     is_active = models.BooleanField(default=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
     winning_user = models.ForeignKey(User, null=True, blank=True, on_delete=models.SET_NULL, related_name="winning_listings")
 
+    # Bid summary, maintained by auctions.bidding.place_bid
+    bid_count = models.PositiveIntegerField(default=0)
+    highest_bid = models.ForeignKey("Bid", null=True, blank=True, on_delete=models.SET_NULL, related_name="+")
+    last_bid_at = models.DateTimeField(null=True, blank=True)
+
+    # Maintained by the comment view
+    comment_count = models.PositiveIntegerField(default=0)
+
+    # Queryset updates (bids, comments, closing) set this by hand; drives API ETag/Last-Modified
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = AuctionListingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # SQLite compares booleans as a bare `WHERE is_active`, which can't seek a
+            # composite (is_active, ...) index, so the active feed gets a partial one
+            models.Index(
+                fields=["-datetime_submitted", "-id"], condition=models.Q(is_active=True),
+                name="active_listing_feed_idx"
+            ),
+            # Category pages, one per sort order (auctions.forms.CategoryFilterForm). The price
+            # one also covers the category summary's count and price range.
+            models.Index(
+                fields=["category", "-datetime_submitted", "-id"], condition=models.Q(is_active=True),
+                name="active_category_newest_idx"
+            ),
+            models.Index(
+                fields=["category", "current_bid", "id"], condition=models.Q(is_active=True),
+                name="active_category_price_idx"
+            ),
+            models.Index(
+                fields=["category", "ends_at", "id"], condition=models.Q(is_active=True),
+                name="active_category_ends_idx"
+            ),
+            # Due auctions for the closer (auctions.closing)
+            models.Index(fields=["ends_at"], condition=models.Q(is_active=True), name="active_listing_ends_idx"),
+        ]
+
     def __str__(self):
         return self.name
     
@@ -33,6 +86,11 @@ class Watchlist(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     listing = models.ForeignKey(AuctionListing, on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "listing"], name="unique_watchlist_user_listing"),
+        ]
+
     def __str__(self):
         return f"{self.user} added {self.listing} in your watchlist."
 
@@ -43,15 +101,85 @@ class Bid(models.Model):
     value = models.DecimalField(max_digits=10, decimal_places=2)
     datetime_submitted = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["listing", "-value"], name="bid_listing_value_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user} submitted a bid of {self.value} on the {self.listing} listing."
 
 
+class ProxyBid(models.Model):
+    """The most a user will pay for a listing; auctions.bidding bids for them up to it."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    listing = models.ForeignKey(AuctionListing, on_delete=models.CASCADE, related_name="proxy_bids")
+    max_value = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "listing"], name="unique_proxy_bid_user_listing"),
+        ]
+        indexes = [
+            # The two highest maximums decide every resolution
+            models.Index(fields=["listing", "-max_value", "created_at"], name="proxy_bid_listing_max_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user} bids up to {self.max_value} on the {self.listing} listing."
+
+
 class Comment(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     listing = models.ForeignKey(AuctionListing, on_delete=models.CASCADE)
     content = models.TextField()
     datetime_submitted = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["listing", "datetime_submitted"], name="comment_listing_time_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user} commented {self.content} on the {self.listing} listing."
+
+
+# Analytics rollups, maintained incrementally by auctions.analytics
+
+class ListingPriceHistory(models.Model):
+    """A listing's bids in one hour: the price range they covered and how many there were."""
+    listing = models.ForeignKey(AuctionListing, on_delete=models.CASCADE, related_name="price_history")
+    hour = models.DateTimeField()
+    low = models.DecimalField(max_digits=10, decimal_places=2)
+    high = models.DecimalField(max_digits=10, decimal_places=2)
+    bid_count = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["listing", "hour"], name="unique_price_history_listing_hour"),
+        ]
+        indexes = [
+            # Rollup merges look up the hours a batch of new bids touches
+            models.Index(fields=["hour"], name="price_history_hour_idx"),
+        ]
+
+
+class CategoryDailyStats(models.Model):
+    """Bids placed in a category on one (UTC) day, and their total value."""
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    bid_count = models.PositiveIntegerField()
+    bid_value = models.DecimalField(max_digits=16, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "category"], name="unique_daily_stats_day_category"),
+        ]
+
+
+class RollupState(models.Model):
+    """How far into the Bid table a rollup has got."""
+    name = models.CharField(max_length=50, unique=True)
+    last_bid_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
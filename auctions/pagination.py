@@ -0,0 +1,93 @@
+import base64
+import functools
+import operator
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+
+
+PAGE_SIZE = getattr(settings, "LISTINGS_PAGE_SIZE", 20)
+COMMENTS_PAGE_SIZE = getattr(settings, "COMMENTS_PAGE_SIZE", 10)
+
+# Largest id SQLite (a signed 64-bit integer) can bind; anything above it
+# overflows when the query runs rather than when it is parsed
+MAX_ID = 2**63 - 1
+
+# Orderings end in a unique column so every row has a distinct position
+NEWEST = ("-datetime_submitted", "-id")
+
+
+def _value(obj, name):
+    # Rows from .values() querysets are dicts
+    return obj[name] if isinstance(obj, dict) else getattr(obj, name)
+
+
+def encode_cursor(obj, ordering=NEWEST):
+    values = [_value(obj, name.lstrip("-")) for name in ordering]
+    raw = "|".join(value.isoformat() if hasattr(value, "isoformat") else str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, model, ordering=NEWEST):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        parts = raw.split("|")
+        if len(parts) != len(ordering):
+            raise ValueError
+        values = [model._meta.get_field(name.lstrip("-")).to_python(part) for name, part in zip(ordering, parts)]
+    except (ValueError, ValidationError):
+        raise Http404("Invalid page cursor.")
+    for value in values:
+        if (
+            isinstance(value, int) and not -MAX_ID - 1 <= value <= MAX_ID
+            or isinstance(value, Decimal) and not value.is_finite()
+        ):
+            raise Http404("Invalid page cursor.")
+    return values
+
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE, ordering=NEWEST):
+    """
+    Return one page of `queryset` in `ordering` (newest first by default) and
+    the cursor of the next page.
+
+    Works for any model with `datetime_submitted` (listings, comments), or any
+    ordering over non-null columns ending in a unique one. Pages are addressed
+    by the ordering values of the last row seen rather than by offset, so every
+    page costs the same index range scan no matter how deep into the feed it
+    is, and rows added meanwhile do not shift later pages.
+    """
+    # Fetch one extra row to know whether there is a next page
+    page = list(_after(queryset, cursor, ordering)[:page_size + 1])
+    return _split(page, page_size, ordering)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=PAGE_SIZE, ordering=NEWEST):
+    """keyset_page() for async views."""
+    page = [obj async for obj in _after(queryset, cursor, ordering)[:page_size + 1]]
+    return _split(page, page_size, ordering)
+
+
+def _after(queryset, cursor, ordering):
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        # (a, b) > (x, y) spelled out as a > x OR (a = x AND b > y), which SQLite can seek on
+        clauses, equal = [], {}
+        for name, value in zip(ordering, decode_cursor(cursor, queryset.model, ordering)):
+            field = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            clauses.append(Q(**equal, **{f"{field}__{lookup}": value}))
+            equal[field] = value
+        queryset = queryset.filter(functools.reduce(operator.or_, clauses))
+    return queryset
+
+
+def _split(page, page_size, ordering):
+    next_cursor = None
+    if len(page) > page_size:
+        page = page[:page_size]
+        next_cursor = encode_cursor(page[-1], ordering)
+    return page, next_cursor
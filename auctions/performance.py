@@ -0,0 +1,140 @@
+"""
+Per-request performance instrumentation.
+
+PerformanceMiddleware (see auctions.middleware) records, for every request,
+the wall time, the number and duration of database queries, the template
+rendering time and the response size. Each response gets a Server-Timing
+header, slow requests are logged with their SQL, and per-view histograms are
+aggregated in process memory for the staff-only performance_stats view.
+
+Template rendering is timed by TimedDjangoTemplates, a drop-in replacement
+for Django's template backend, which only does work while a request is
+being measured.
+"""
+import contextvars
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+
+logger = logging.getLogger("auctions.performance")
+
+SLOW_REQUEST_MS = getattr(settings, "PERFORMANCE_SLOW_REQUEST_MS", 500)
+# Upper bounds of the latency histogram buckets, in milliseconds
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+MAX_LOGGED_QUERIES = 100
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    __slots__ = ("start", "queries", "db_time", "template_time", "sql")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.sql = []
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper: time the query against the active request."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.queries += 1
+        metrics.db_time += elapsed
+        if len(metrics.sql) < MAX_LOGGED_QUERIES:
+            metrics.sql.append((elapsed, sql))
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
+
+
+class ViewStats:
+    __slots__ = ("count", "buckets", "total_ms", "max_ms", "queries", "db_ms", "template_ms", "bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.total_ms = self.max_ms = self.db_ms = self.template_ms = 0.0
+        self.queries = self.bytes = 0
+
+    def as_dict(self):
+        count = self.count or 1
+        return {
+            "count": self.count,
+            "histogram_ms": {("+Inf" if bound == float("inf") else bound): n for bound, n in zip(BUCKETS, self.buckets)},
+            "mean_ms": round(self.total_ms / count, 2),
+            "max_ms": round(self.max_ms, 2),
+            "mean_queries": round(self.queries / count, 2),
+            "mean_db_ms": round(self.db_ms / count, 2),
+            "mean_template_ms": round(self.template_ms / count, 2),
+            "mean_bytes": self.bytes // count,
+        }
+
+
+class Histograms:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def record(self, view, total_ms, metrics, size):
+        with self.lock:
+            stats = self.views.get(view)
+            if stats is None:
+                stats = self.views[view] = ViewStats()
+            stats.count += 1
+            stats.buckets[bisect_left(BUCKETS, total_ms)] += 1
+            stats.total_ms += total_ms
+            stats.max_ms = max(stats.max_ms, total_ms)
+            stats.queries += metrics.queries
+            stats.db_ms += metrics.db_time * 1000
+            stats.template_ms += metrics.template_time * 1000
+            stats.bytes += size
+
+    def snapshot(self):
+        with self.lock:
+            return {view: stats.as_dict() for view, stats in sorted(self.views.items())}
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+
+histograms = Histograms()
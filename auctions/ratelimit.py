@@ -0,0 +1,84 @@
+"""
+Token-bucket rate limiting for write endpoints.
+
+Each endpoint has a bucket per user and per client IP holding up to `burst`
+tokens, refilled at `rate` tokens per second; a request spends one token
+from each of its buckets. Buckets are (tokens, timestamp) pairs in Django's
+cache (RATE_LIMIT_CACHE, the in-memory default cache unless configured), so
+one get_many and one set_many per request is the whole cost.
+
+The read-modify-write is not atomic across processes, so a burst of
+concurrent requests can get a few extra through. The limiter is there to
+stop floods, not to count exactly.
+"""
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+
+class TokenBucketLimiter:
+    def __init__(self, scope, rate, burst, cache_alias="default"):
+        self.scope = scope
+        self.rate = rate
+        self.burst = burst
+        self.cache = caches[cache_alias]
+        # A bucket left alone this long is full again, so it can expire
+        self.timeout = math.ceil(burst / rate) + 1
+
+    def hit(self, idents, now=None):
+        """
+        Spend a token from the bucket of every ident in `idents`.
+
+        Returns 0 if the request may go ahead, otherwise the number of seconds
+        until it could; rejected requests spend nothing.
+        """
+        now = time.time() if now is None else now
+        keys = [f"ratelimit:{self.scope}:{ident}" for ident in idents]
+        buckets = self.cache.get_many(keys)
+
+        wait = 0
+        spent = {}
+        for key in keys:
+            tokens, stamp = buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - stamp) * self.rate)
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / self.rate)
+            spent[key] = (tokens - 1, now)
+
+        if not wait:
+            self.cache.set_many(spent, self.timeout)
+        return wait
+
+
+def get_limiter(scope):
+    """The limiter configured for `scope` in RATE_LIMITS, or None if it is unlimited."""
+    limit = getattr(settings, "RATE_LIMITS", {}).get(scope)
+    if not limit:
+        return None
+    return TokenBucketLimiter(
+        scope, limit["rate"], limit["burst"], getattr(settings, "RATE_LIMIT_CACHE", "default")
+    )
+
+
+def rate_limit(scope):
+    """Limit POSTs to the decorated view per user and per client IP; others pass through."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limiter = get_limiter(scope) if request.method == "POST" else None
+            if limiter:
+                idents = [f"ip:{request.META.get('REMOTE_ADDR')}"]
+                if request.user.is_authenticated:
+                    idents.append(f"user:{request.user.id}")
+                wait = limiter.hit(idents)
+                if wait:
+                    response = HttpResponse("Too many requests. Please slow down.", status=429, content_type="text/plain")
+                    response["Retry-After"] = math.ceil(wait)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
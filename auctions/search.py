@@ -0,0 +1,135 @@
+"""
+Full-text search over listing names and descriptions.
+
+On SQLite the text lives in an FTS5 index (auctions_listing_fts) that
+triggers keep in step with auctions_auctionlisting, so bulk inserts and
+queryset updates are indexed too. Other databases fall back to icontains
+filtering.
+
+SQLite migrations that rebuild auctions_auctionlisting drop its triggers;
+they must call install_fts() again afterwards (the rebuild_search_index
+command does the same by hand).
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import AuctionListing
+
+
+PAGE_SIZE = getattr(settings, "SEARCH_PAGE_SIZE", 20)
+FTS_TABLE = "auctions_listing_fts"
+
+# Matches in the name count ten times as much as matches in the description.
+# Stored as the table's default rank, which FTS5 sorts faster than an
+# explicit bm25() call in ORDER BY.
+RANK = "bm25(10.0, 1.0)"
+
+
+TRIGGERS = [
+    f"""
+    CREATE TRIGGER auctions_listing_fts_insert AFTER INSERT ON auctions_auctionlisting BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER auctions_listing_fts_delete AFTER DELETE ON auctions_auctionlisting BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    # Bids update the listing row constantly; only reindex when the text changes
+    f"""
+    CREATE TRIGGER auctions_listing_fts_update AFTER UPDATE OF name, description ON auctions_auctionlisting
+    WHEN old.name IS NOT new.name OR old.description IS NOT new.description BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END
+    """,
+]
+
+
+def install_fts(cursor):
+    """Create (or recreate) the FTS5 table and its triggers, and index every listing."""
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"name, description, content='auctions_auctionlisting', content_rowid='id')"
+    )
+    for trigger in ("insert", "delete", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS auctions_listing_fts_{trigger}")
+    for statement in TRIGGERS:
+        cursor.execute(statement)
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) VALUES ('rank', %s)", [RANK])
+    cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_fts(cursor):
+    for trigger in ("insert", "delete", "update"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS auctions_listing_fts_{trigger}")
+    cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def match_expression(query):
+    """
+    Turn free text into an FTS5 query matching listings that contain every word.
+
+    The last word also matches as a prefix, so partly typed queries find
+    results without every short word fanning out into thousands of terms.
+    """
+    words = [f'"{word}"' for word in re.findall(r"\w+", query)]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+def search_listings(query, category_id=None, active_only=True, page=1, page_size=PAGE_SIZE):
+    """
+    Return (listings, has_next) for one page of results, best matches first.
+
+    Listings are loaded as cards (see AuctionListingQuerySet.cards).
+    """
+    offset = (page - 1) * page_size
+    if connection.vendor != "sqlite":
+        return _search_icontains(query, category_id, active_only, offset, page_size)
+
+    expression = match_expression(query)
+    if not expression:
+        return [], False
+
+    sql = [
+        f"SELECT l.id FROM {FTS_TABLE} JOIN auctions_auctionlisting l ON l.id = {FTS_TABLE}.rowid",
+        f"WHERE {FTS_TABLE} MATCH %s",
+    ]
+    params = [expression]
+    if active_only:
+        sql.append("AND l.is_active")
+    if category_id is not None:
+        sql.append("AND l.category_id = %s")
+        params.append(category_id)
+    sql.append(f"ORDER BY {FTS_TABLE}.rank LIMIT %s OFFSET %s")
+    params += [page_size + 1, offset]
+
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(sql), params)
+        ids = [row[0] for row in cursor.fetchall()]
+
+    has_next = len(ids) > page_size
+    ids = ids[:page_size]
+    found = AuctionListing.objects.cards().in_bulk(ids)
+    return [found[listing_id] for listing_id in ids if listing_id in found], has_next
+
+
+def _search_icontains(query, category_id, active_only, offset, page_size):
+    listings = AuctionListing.objects.cards()
+    for word in re.findall(r"\w+", query):
+        listings = listings.filter(Q(name__icontains=word) | Q(description__icontains=word))
+    if active_only:
+        listings = listings.filter(is_active=True)
+    if category_id is not None:
+        listings = listings.filter(category_id=category_id)
+
+    page = list(listings.order_by("-datetime_submitted", "-id")[offset:offset + page_size + 1])
+    return page[:page_size], len(page) > page_size
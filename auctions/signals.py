@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .auth import invalidate_user
+from .caching import bump_listing_version, invalidate_category_summaries
+from .models import AuctionListing, Bid, Comment, User
+
+
+def _bump_on_commit(listing_id):
+    transaction.on_commit(lambda: bump_listing_version(listing_id))
+
+
+@receiver([post_save, post_delete], sender=AuctionListing)
+def listing_changed(sender, instance, **kwargs):
+    _bump_on_commit(instance.id)
+    # Listings are saved when they are created, closed or edited, all of which can change the counts
+    transaction.on_commit(invalidate_category_summaries)
+
+
+@receiver([post_save, post_delete], sender=Bid)
+@receiver([post_save, post_delete], sender=Comment)
+def listing_activity(sender, instance, **kwargs):
+    _bump_on_commit(instance.listing_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.id)
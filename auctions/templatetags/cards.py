@@ -0,0 +1,38 @@
+from django import template
+from django.urls import reverse
+from django.utils.text import Truncator
+
+from .photos import picture
+
+
+register = template.Library()
+
+SUMMARY_LENGTH = 300
+CARD_PHOTO_SIZES = "(min-width: 992px) 17vw, (min-width: 768px) 33vw, 100vw"
+
+
+def summary(text, length=SUMMARY_LENGTH):
+    # Same as truncatechars, but skips its character-by-character scan when
+    # the text already fits, which most summaries do
+    if len(text) <= length:
+        return text
+    return Truncator(text).chars(length)
+
+
+@register.inclusion_tag("auctions/partials/listing_card.html")
+def listing_card(listing, show_status=False, dark=True):
+    """
+    Render the card every listing feed uses.
+
+    Everything the card shows is worked out here in one pass, so the partial
+    only fills in values. `show_status` adds the active/closed badge and the
+    end date; `dark` keeps the card text from taking the link colour.
+    """
+    return {
+        "listing": listing,
+        "url": reverse("listing_details", args=[listing.id]),
+        "summary": summary(listing.summary),
+        "show_status": show_status,
+        "dark": dark,
+        **picture(listing.photo, alt=listing, sizes=CARD_PHOTO_SIZES, width="100%", height="200px"),
+    }
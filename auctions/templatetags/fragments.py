@@ -0,0 +1,37 @@
+from django import template
+
+from ..caching import get_or_render
+
+
+register = template.Library()
+
+
+class ListingFragmentNode(template.Node):
+    def __init__(self, nodelist, name, listing, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.listing = listing
+        self.vary_on = vary_on
+
+    def render(self, context):
+        listing = self.listing.resolve(context)
+        vary_on = [var.resolve(context) for var in self.vary_on]
+        return get_or_render(self.name, listing, vary_on, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def listing_fragment(parser, token):
+    """
+    Cache the enclosed template until the listing changes.
+
+        {% listing_fragment "card" listing [vary_on ...] %} ... {% endlisting_fragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name and a listing.")
+    nodelist = parser.parse(("endlisting_fragment",))
+    parser.delete_first_token()
+    name = bits[1].strip("\"'")
+    return ListingFragmentNode(
+        nodelist, name, parser.compile_filter(bits[2]), [parser.compile_filter(bit) for bit in bits[3:]]
+    )
@@ -0,0 +1,29 @@
+from django import template
+
+from ..thumbnails import WIDTHS, thumbnail_name, has_thumbnails
+
+
+register = template.Library()
+
+
+def srcset(fieldfile, ext):
+    storage = fieldfile.storage
+    return ", ".join(f"{storage.url(thumbnail_name(fieldfile.name, width, ext))} {width}w" for width in WIDTHS)
+
+
+@register.inclusion_tag("auctions/partials/picture.html")
+def picture(photo, alt="", sizes="100vw", loading="lazy", **attrs):
+    """
+    Render `photo` as a <picture> offering its WebP and JPEG thumbnails.
+
+    Falls back to the original upload for photos whose thumbnails have not
+    been generated yet, and renders nothing when there is no photo.
+    """
+    context = {"alt": alt, "sizes": sizes, "loading": loading, "attrs": attrs}
+    if has_thumbnails(photo):
+        context["webp_srcset"] = srcset(photo, "webp")
+        context["jpg_srcset"] = srcset(photo, "jpg")
+        context["src"] = photo.storage.url(thumbnail_name(photo.name, WIDTHS[0], "jpg"))
+    elif photo:
+        context["src"] = photo.url
+    return context
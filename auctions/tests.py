@@ -1,3 +1,1019 @@
-from django.test import TestCase
+import base64
+import gzip
+import json
+import os
+import re
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import ConnectionHandler
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
+from PIL import Image
+
+from commerce import assets
+from commerce.database import ReadReplicaRouter, enable_wal, read_from_replica, sqlite_databases
+
+from . import analytics, caching, events, performance, watchlists
+from .bidding import place_bid, set_proxy_bid, BidContention, BidTooLow, ListingClosed, OwnListing
+from .closing import close_due_auctions
+from .forms import CategoryFilterForm
+from .models import User, Category, AuctionListing, Watchlist, Comment, Bid, ProxyBid
+from .pagination import NEWEST, keyset_page
+from .ratelimit import TokenBucketLimiter
+from .search import search_listings
+from .templatetags.cards import summary
+from .thumbnails import WIDTHS, make_thumbnails, thumbnail_name
+
+
+class AuctionsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller", password="secret")
+        cls.buyer = User.objects.create_user("buyer", password="secret")
+        cls.bidder = User.objects.create_user("bidder", password="secret")
+        cls.category = Category.objects.create(name="Books")
+        cls.listings = [
+            AuctionListing.objects.create(
+                name=f"Listing {i}", description="A listing", current_bid=Decimal("10.00"),
+                category=cls.category, listed_by=cls.seller, photo="listings/comics.jpg"
+            )
+            for i in range(5)
+        ]
+        cls.listing = cls.listings[0]
+        place_bid(cls.listing, cls.buyer, Decimal("11.00"))
+        watchlists.toggle(cls.buyer, cls.listing.id)
+        Comment.objects.create(user=cls.buyer, listing=cls.listing, content="Nice")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.buyer)
+
+
+class QueryPlanTests(AuctionsTestCase):
+    """Every filtered query the views run on auctions tables should be answered from an index."""
+
+    full_scan = re.compile(r"^SCAN (TABLE )?auctions_\w+( AS \w+)?$")
+
+    def assertViewUsesIndexes(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        for query in ctx.captured_queries:
+            sql = query["sql"]
+            if not sql.startswith("SELECT") or "auctions_" not in sql or " WHERE " not in sql:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute("EXPLAIN QUERY PLAN " + sql)
+                plan = [row[-1] for row in cursor.fetchall()]
+            for step in plan:
+                self.assertIsNone(self.full_scan.match(step), f"{url}: {sql}\n{plan}")
+
+    def test_index(self):
+        self.assertViewUsesIndexes(reverse("index"))
+
+    def test_category_matches(self):
+        for sort in CategoryFilterForm.ORDERINGS:
+            self.assertViewUsesIndexes(reverse("category_matches", args=[self.category.id]) + f"?sort={sort}")
+
+    def test_watchlist(self):
+        self.assertViewUsesIndexes(reverse("watchlist"))
+
+    def test_listing_details(self):
+        self.assertViewUsesIndexes(reverse("listing_details", args=[self.listing.id]))
+
+
+class CategoryTests(AuctionsTestCase):
+    def test_summary_is_cached_until_listings_change(self):
+        with self.assertNumQueries(1):
+            books, = caching.category_summaries()
+        self.assertEqual((books.active_count, books.min_price, books.max_price), (5, Decimal("10.00"), Decimal("11.00")))
+        with self.assertNumQueries(0):
+            caching.category_summaries()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AuctionListing.objects.create(
+                name="Cheap", description="", current_bid=Decimal("1.00"), category=self.category, listed_by=self.seller
+            )
+        books, = caching.category_summaries()
+        self.assertEqual((books.active_count, books.min_price), (6, Decimal("1.00")))
+
+        self.client.force_login(self.seller)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("close_auction", args=[self.listing.id]))
+        books, = caching.category_summaries()
+        self.assertEqual((books.active_count, books.max_price), (5, Decimal("10.00")))
+
+    def test_keyset_pages_follow_the_ordering(self):
+        for i, listing in enumerate(self.listings):
+            # Ties on price must still page in id order
+            listing.current_bid = Decimal(10 + i // 2)
+            listing.ends_at = timezone.now() + timedelta(days=5 - i)
+            listing.save()
+
+        for ordering in CategoryFilterForm.ORDERINGS.values():
+            expected = list(AuctionListing.objects.order_by(*ordering).values_list("id", flat=True))
+            seen, cursor = [], None
+            while True:
+                page, cursor = keyset_page(AuctionListing.objects.all(), cursor, page_size=2, ordering=ordering)
+                seen += [listing.id for listing in page]
+                if cursor is None:
+                    break
+            self.assertEqual(seen, expected, ordering)
+
+    def test_keyset_pages_through_ties(self):
+        # Several listings submitted in the same instant: the id decides their order
+        submitted = timezone.now()
+        AuctionListing.objects.filter(id__in=[listing.id for listing in self.listings[1:4]]).update(
+            datetime_submitted=submitted
+        )
+        expected = list(AuctionListing.objects.order_by(*NEWEST).values_list("id", flat=True))
+
+        seen, cursor = [], None
+        while True:
+            # Pages of two split the tied run down the middle
+            page, cursor = keyset_page(AuctionListing.objects.all(), cursor, page_size=2)
+            seen += [listing.id for listing in page]
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(set(seen)), len(self.listings))
+
+        index, by_price = reverse("index"), reverse("category_matches", args=[self.category.id])
+        self.assertEqual(self.client.get(index, {"after": "not-a-cursor"}).status_code, 404)
+        for url, raw in (
+            (index, "not|a|date"),
+            (index, "2026-01-01T00:00:00|x"),
+            # Parse, but can't be bound as SQLite integers or compared as prices
+            (index, "2026-01-01T00:00:00|99999999999999999999999"),
+            (by_price, "10|99999999999999999999999"),
+            (by_price, "NaN|1"),
+            (by_price, "Infinity|1"),
+        ):
+            cursor = base64.urlsafe_b64encode(raw.encode()).decode()
+            self.assertEqual(self.client.get(url, {"sort": "price", "after": cursor}).status_code, 404, raw)
+
+    def test_category_page_defaults_to_active(self):
+        AuctionListing.objects.filter(id=self.listing.id).update(is_active=False)
+        url = reverse("category_matches", args=[self.category.id])
+
+        response = self.client.get(url, {"sort": "price_desc"})
+        self.assertNotIn(self.listing, response.context["listings"])
+        self.assertEqual(len(response.context["listings"]), 4)
+
+        response = self.client.get(url, {"sort": "price_desc", "include_closed": "on"})
+        self.assertEqual(response.context["listings"][0], self.listing)
+
+        self.assertEqual(self.client.get(url, {"sort": "cheapest"}).status_code, 404)
+
+
+class ToggleWatchlistTests(AuctionsTestCase):
+    def test_toggle_removes_then_adds(self):
+        url = reverse("toggle_watchlist", args=[self.listing.id])
+
+        self.client.post(url)
+        self.assertFalse(Watchlist.objects.filter(user=self.buyer, listing=self.listing).exists())
+
+        self.client.post(url)
+        self.assertEqual(Watchlist.objects.filter(user=self.buyer, listing=self.listing).count(), 1)
+
+    def test_toggle_unknown_listing(self):
+        response = self.client.post(reverse("toggle_watchlist", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_toggle_maintains_count(self):
+        url = reverse("toggle_watchlist", args=[self.listing.id])
+        self.client.post(url)
+        self.assertEqual(User.objects.get(id=self.buyer.id).watchlist_count, 0)
+        self.client.post(url)
+        self.assertEqual(User.objects.get(id=self.buyer.id).watchlist_count, 1)
+
+    def test_recount_counters(self):
+        # Bulk-created entries, like seed_data's, don't bump the count
+        Watchlist.objects.bulk_create([Watchlist(user=self.seller, listing=listing) for listing in self.listings[:3]])
+        User.objects.filter(id=self.buyer.id).update(watchlist_count=7)
+        call_command("recount_counters", stdout=StringIO())
+        self.assertEqual(User.objects.get(id=self.seller.id).watchlist_count, 3)
+        self.assertEqual(User.objects.get(id=self.buyer.id).watchlist_count, 1)
+
+    def test_batch(self):
+        response = self.client.post(
+            reverse("watchlist_batch"),
+            {"add": [self.listings[1].id, self.listings[2].id, 999999], "remove": [self.listing.id]},
+            content_type="application/json"
+        )
+        self.assertEqual(response.json(), {"watched": [self.listings[1].id, self.listings[2].id], "count": 2})
+        self.assertEqual(User.objects.get(id=self.buyer.id).watchlist_count, 2)
+
+        for ids in (["x"], [0], [2**63]):
+            response = self.client.post(reverse("watchlist_batch"), {"add": ids}, content_type="application/json")
+            self.assertEqual(response.status_code, 400, ids)
+
+    def test_membership(self):
+        ids = ",".join(str(listing.id) for listing in self.listings)
+        response = self.client.get(reverse("watchlist_membership"), {"ids": ids})
+        self.assertEqual(response.json(), {"watched": [self.listing.id]})
+
+        for ids in ("x", "0", "99999999999999999999999"):
+            self.assertEqual(self.client.get(reverse("watchlist_membership"), {"ids": ids}).status_code, 400, ids)
+
+    def test_feed_marks_watched_listings(self):
+        response = self.client.get(reverse("index"))
+        self.assertEqual(response.context["watched"], {self.listing.id})
+        self.assertContains(response, "Watching", count=1)
+
+
+class CommentTests(AuctionsTestCase):
+    def test_comment_bumps_count(self):
+        self.client.post(reverse("comment", args=[self.listing.id]), {"content": "Hello"})
+        self.assertEqual(AuctionListing.objects.get(id=self.listing.id).comment_count, 1)
+
+        response = self.client.post(reverse("comment", args=[0]), {"content": "Hello"})
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Comment.objects.filter(listing_id=0).exists())
+
+    def test_rejected_comment_shown_on_closed_listing(self):
+        AuctionListing.objects.filter(id=self.listing.id).update(is_active=False)
+        response = self.client.post(reverse("comment", args=[self.listing.id]), {"content": ""}, follow=True)
+        self.assertContains(response, "Enter a comment.")
+        # Shown once, not carried over to the next page
+        self.assertNotContains(self.client.get(reverse("listing_details", args=[self.listing.id])), "Enter a comment.")
+
+    def test_recount_counters(self):
+        # Bulk-created comments, like seed_data's, don't bump the count
+        Comment.objects.bulk_create([
+            Comment(user=self.seller, listing=self.listings[1], content=f"Comment {i}") for i in range(2)
+        ])
+        call_command("recount_counters", stdout=StringIO())
+        counts = dict(AuctionListing.objects.values_list("id", "comment_count"))
+        self.assertEqual(counts[self.listing.id], 1)
+        self.assertEqual(counts[self.listings[1].id], 2)
+        self.assertEqual(counts[self.listings[2].id], 0)
+
+    def test_load_more_pages_newest_first(self):
+        Comment.objects.bulk_create([
+            Comment(user=self.seller, listing=self.listing, content=f"Comment {i}") for i in range(15)
+        ])
+        expected = list(
+            Comment.objects.filter(listing=self.listing).order_by("-datetime_submitted", "-id").values_list("id", flat=True)
+        )
+
+        response = self.client.get(reverse("listing_details", args=[self.listing.id]))
+        self.assertContains(response, 'id="more-comments"')
+        self.assertEqual(len(response.context["comment_page"]()["comments"]), 10)
+
+        seen, cursor = [], ""
+        while cursor is not None:
+            page = self.client.get(reverse("listing_comments", args=[self.listing.id]), {"after": cursor}).json()
+            seen += [comment["id"] for comment in page["comments"]]
+            cursor = page["next_cursor"]
+        self.assertEqual(seen, expected)
+
+
+class EventTests(AuctionsTestCase):
+    async def test_stream_delivers_until_closed(self):
+        broker = events.get_broker()
+        stream = events.stream(self.listing.id)
+        self.assertEqual(await anext(stream), "retry: 3000\n\n")
+        self.assertEqual(broker.subscriber_count(self.listing.id), 1)
+
+        broker.publish(self.listing.id, {"type": "bid", "current_bid": "12.00"})
+        self.assertEqual(await anext(stream), 'event: bid\ndata: {"type": "bid", "current_bid": "12.00"}\n\n')
+        broker.publish(self.listing.id, {"type": "closed"})
+        self.assertTrue((await anext(stream)).startswith("event: closed\n"))
+
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(broker.subscriber_count(self.listing.id), 0)
+
+        # A client that goes away is unsubscribed when the server closes its stream
+        stream = events.stream(self.listing.id)
+        await anext(stream)
+        await stream.aclose()
+        self.assertEqual(broker.subscriber_count(self.listing.id), 0)
+
+    async def test_streams_only_under_asgi(self):
+        url = reverse("listing_events", args=[self.listing.id])
+        response = await self.async_client.get(url)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        await anext(content)
+        self.assertEqual(events.get_broker().subscriber_count(self.listing.id), 1)
+        events.get_broker().publish(self.listing.id, {"type": "closed"})
+        self.assertTrue((await anext(content)).startswith(b"event: closed\n"))
+        with self.assertRaises(StopAsyncIteration):
+            await anext(content)
+        self.assertEqual(events.get_broker().subscriber_count(self.listing.id), 0)
+
+        # Under WSGI the stream would tie up a thread and never be flushed
+        response = await sync_to_async(self.client.get)(url)
+        self.assertEqual(response.status_code, 204)
+        page = await sync_to_async(self.client.get)(reverse("listing_details", args=[self.listing.id]))
+        self.assertNotContains(page, "EventSource")
+
+
+class ApiTests(AuctionsTestCase):
+    def test_listing_conditional_get(self):
+        url = reverse("api_listing", args=[self.listing.id])
+        response = self.client.get(url)
+        self.assertEqual(response.json()["current_bid"], "11.00")
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+        place_bid(self.listing, self.bidder, Decimal("12.00"))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["winning_user"], "bidder")
+
+    def test_feed_revalidates_by_etag_only(self):
+        url = reverse("api_listings")
+        response = self.client.get(url, {"limit": 2})
+        self.assertNotIn("Last-Modified", response)
+
+        # The newest listing closes, and an older, unchanged one takes its place on the page
+        AuctionListing.objects.filter(id=self.listings[-1].id).update(is_active=False)
+        response = self.client.get(url, {"limit": 2}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row["id"] for row in response.json()["results"]], [self.listings[3].id, self.listings[2].id])
+
+    def test_field_selection(self):
+        response = self.client.get(reverse("api_listings"), {"fields": "id,current_bid", "limit": 2})
+        page = response.json()
+        self.assertEqual(page["results"][0], {"id": self.listings[-1].id, "current_bid": "10.00"})
+        self.assertIn("after=", page["next"])
+
+        response = self.client.get(reverse("api_listings"), {"fields": "password"})
+        self.assertEqual(response.status_code, 400)
+
+        for params in ({"category": "0"}, {"category": "99999999999999999999999"}, {"limit": "1000"}):
+            self.assertEqual(self.client.get(reverse("api_listings"), params).status_code, 400, params)
+
+    def test_bid_history_streams(self):
+        place_bid(self.listing, self.bidder, Decimal("12.00"))
+        response = self.client.get(reverse("api_listing_bids", args=[self.listing.id]), {"fields": "user,value"})
+        self.assertTrue(response.streaming)
+        body = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(body, {"results": [{"user": "bidder", "value": "12.00"}, {"user": "buyer", "value": "11.00"}]})
+
+        response = self.client.get(reverse("api_listing_bids", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_categories(self):
+        response = self.client.get(reverse("api_categories"), {"fields": "name"})
+        self.assertEqual(response.json(), {"results": [{"name": "Books"}]})
+        response = self.client.get(reverse("api_categories"), {"fields": "name"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+
+class RateLimitTests(AuctionsTestCase):
+    def test_bucket_refills(self):
+        limiter = TokenBucketLimiter("test", rate=0.5, burst=2)
+        self.assertEqual(limiter.hit(["a"], now=0), 0)
+        self.assertEqual(limiter.hit(["a"], now=0), 0)
+        self.assertEqual(limiter.hit(["a"], now=0), 2)
+        # A rejected request spends nothing, in any of its buckets
+        self.assertEqual(limiter.hit(["b", "a"], now=1), 1)
+        self.assertEqual(limiter.hit(["b"], now=1), 0)
+        self.assertEqual(limiter.hit(["a"], now=2), 0)
+
+    @override_settings(RATE_LIMITS={"comment": {"rate": 0.01, "burst": 2}})
+    def test_comment_returns_429(self):
+        url = reverse("comment", args=[self.listing.id])
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {"content": "Hi"}).status_code, 302)
+        response = self.client.post(url, {"content": "Hi"})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "100")
+        self.assertEqual(Comment.objects.filter(listing=self.listing, content="Hi").count(), 2)
+
+        # Still limited by IP after switching accounts
+        self.client.force_login(self.seller)
+        self.assertEqual(self.client.post(url, {"content": "Hi"}).status_code, 429)
+
+
+class AnalyticsTests(AuctionsTestCase):
+    def test_rollups_count_each_bid_once(self):
+        place_bid(self.listing, self.bidder, Decimal("12.00"))
+        self.assertEqual(analytics.update_rollups(batch_size=1), 2)
+        self.assertEqual(analytics.update_rollups(), 0)
+
+        place_bid(self.listing, self.buyer, Decimal("15.00"))
+        place_bid(self.listings[1], self.buyer, Decimal("20.00"))
+        self.assertEqual(analytics.update_rollups(), 2)
+
+        hour, = analytics.price_history(self.listing.id)
+        self.assertEqual((hour["low"], hour["high"], hour["bid_count"]), (Decimal("11.00"), Decimal("15.00"), 3))
+        day, = analytics.daily_stats(timezone.now().date() - timedelta(days=1))
+        self.assertEqual((day["category_id"], day["bid_count"], day["bid_value"]), (self.category.id, 4, Decimal("58.00")))
+
+    def test_daily_report(self):
+        analytics.update_rollups()
+        User.objects.filter(id=self.buyer.id).update(is_staff=True)
+        url = reverse("daily_report")
+        day, = self.client.get(url, {"category": self.category.id}).json()["days"]
+        self.assertEqual((day["category_id"], day["bid_count"]), (self.category.id, 1))
+        self.assertEqual(self.client.get(url, {"category": self.category.id + 1}).json()["days"], [])
+
+        for category in ("x", "0", "-1", "99999999999999999999999"):
+            self.assertEqual(self.client.get(url, {"category": category}).status_code, 400, category)
+
+    def test_price_history_endpoint(self):
+        analytics.update_rollups()
+        url = reverse("api_listing_price_history", args=[self.listing.id])
+        response = self.client.get(url)
+        self.assertEqual(response.json()["results"][0]["high"], "11.00")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+        place_bid(self.listing, self.bidder, Decimal("12.00"))
+        analytics.update_rollups()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 200)
+
+
+class BidTests(AuctionsTestCase):
+    def assertNothingWritten(self):
+        listing = AuctionListing.objects.get(id=self.listing.id)
+        self.assertEqual((listing.current_bid, listing.winning_user, listing.bid_count), (Decimal("11.00"), self.buyer, 1))
+        self.assertEqual(Bid.objects.filter(listing=self.listing).count(), 1)
+
+    def test_too_low(self):
+        for value in ("10.00", "11.00"):
+            with self.assertRaises(BidTooLow):
+                place_bid(self.listing, self.bidder, Decimal(value))
+        self.assertNothingWritten()
+
+    def test_closed(self):
+        AuctionListing.objects.filter(id=self.listing.id).update(is_active=False)
+        self.listing.is_active = False
+        with self.assertRaises(ListingClosed):
+            place_bid(self.listing, self.bidder, Decimal("20.00"))
+
+        # Closed since the bidder loaded the page
+        AuctionListing.objects.filter(id=self.listing.id).update(is_active=True, ends_at=timezone.now())
+        self.listing.is_active = True
+        with self.assertRaises(ListingClosed):
+            place_bid(self.listing, self.bidder, Decimal("20.00"))
+        self.assertEqual(Bid.objects.filter(listing=self.listing).count(), 1)
+
+    def test_seller_cannot_bid(self):
+        with self.assertRaises(OwnListing):
+            place_bid(self.listing, self.seller, Decimal("20.00"))
+        with self.assertRaises(OwnListing):
+            set_proxy_bid(self.listing, self.seller, Decimal("50.00"))
+        self.assertFalse(ProxyBid.objects.exists())
+        self.assertNothingWritten()
+
+        # A proxy stored before sellers were refused doesn't answer bids either
+        ProxyBid.objects.create(user=self.seller, listing=self.listing, max_value=Decimal("50.00"))
+        place_bid(self.listing, self.bidder, Decimal("12.00"))
+        self.listing.refresh_from_db()
+        self.assertEqual((self.listing.current_bid, self.listing.winning_user), (Decimal("12.00"), self.bidder))
+
+    def test_lost_race(self):
+        # The seller was shown 11.00, but 15.00 got in first
+        stale = AuctionListing.objects.get(id=self.listing.id)
+        AuctionListing.objects.filter(id=self.listing.id).update(current_bid=Decimal("15.00"))
+        with self.assertRaises(BidContention):
+            place_bid(stale, self.bidder, Decimal("12.00"))
+
+        listing = AuctionListing.objects.get(id=self.listing.id)
+        self.assertEqual((listing.current_bid, listing.winning_user, listing.bid_count), (Decimal("15.00"), self.buyer, 1))
+        self.assertFalse(Bid.objects.filter(user=self.bidder).exists())
+        # The bidder is shown the price that beat them
+        self.assertEqual(stale.current_bid, Decimal("15.00"))
+
+    def assertSummary(self, listing_id, bid_count, highest_bid, last_bid_at):
+        listing = AuctionListing.objects.get(id=listing_id)
+        self.assertEqual((listing.bid_count, listing.highest_bid, listing.last_bid_at), (bid_count, highest_bid, last_bid_at))
+
+    def test_summary_follows_bids(self):
+        first = Bid.objects.get(listing=self.listing)
+        self.assertSummary(self.listing.id, 1, first, first.datetime_submitted)
+
+        bid = place_bid(self.listing, self.bidder, Decimal("12.00"))
+        self.assertSummary(self.listing.id, 2, bid, bid.datetime_submitted)
+        self.assertEqual((self.listing.bid_count, self.listing.highest_bid), (2, bid))
+
+        # A rejected bid leaves the summary alone
+        with self.assertRaises(BidTooLow):
+            place_bid(self.listing, self.buyer, Decimal("12.00"))
+        self.assertSummary(self.listing.id, 2, bid, bid.datetime_submitted)
+
+    def test_backfill_bid_summary(self):
+        # Bids written behind place_bid's back, two of them tied for the top
+        tied, _, latest = Bid.objects.bulk_create([
+            Bid(user=self.seller, listing=self.listings[1], value=Decimal("30.00")),
+            Bid(user=self.buyer, listing=self.listings[1], value=Decimal("30.00")),
+            Bid(user=self.buyer, listing=self.listings[1], value=Decimal("20.00")),
+        ])
+        # The latest bid isn't the highest
+        Bid.objects.filter(id=latest.id).update(datetime_submitted=latest.datetime_submitted + timedelta(minutes=1))
+        latest.refresh_from_db()
+        AuctionListing.objects.filter(id=self.listing.id).update(bid_count=0, highest_bid=None, last_bid_at=None)
+        call_command("backfill_bid_summary", stdout=StringIO())
+
+        first = Bid.objects.get(listing=self.listing)
+        self.assertSummary(self.listing.id, 1, first, first.datetime_submitted)
+        # The tie goes to the bid that got there first
+        self.assertSummary(self.listings[1].id, 3, tied, latest.datetime_submitted)
+        self.assertSummary(self.listings[2].id, 0, None, None)
+
+
+class ProxyBidTests(AuctionsTestCase):
+    def test_highest_maximum_wins_one_increment_above_runner_up(self):
+        rival = User.objects.create_user("rival")
+        set_proxy_bid(self.listing, self.bidder, Decimal("30.00"))
+        set_proxy_bid(self.listing, rival, Decimal("50.00"))
+
+        self.listing.refresh_from_db()
+        self.assertEqual(self.listing.current_bid, Decimal("31.00"))
+        self.assertEqual(self.listing.winning_user, rival)
+        # One bid per proxy set, not one per increment
+        self.assertEqual(Bid.objects.filter(listing=self.listing).count(), 3)
+
+    def test_tie_goes_to_earlier_maximum(self):
+        rival = User.objects.create_user("rival")
+        set_proxy_bid(self.listing, self.bidder, Decimal("40.00"))
+        set_proxy_bid(self.listing, rival, Decimal("40.00"))
+
+        self.listing.refresh_from_db()
+        self.assertEqual((self.listing.current_bid, self.listing.winning_user), (Decimal("40.00"), self.bidder))
+
+    def test_proxy_answers_manual_bid(self):
+        set_proxy_bid(self.listing, self.bidder, Decimal("40.00"))
+        place_bid(self.listing, self.buyer, Decimal("25.00"))
+
+        self.listing.refresh_from_db()
+        self.assertEqual((self.listing.current_bid, self.listing.winning_user), (Decimal("26.00"), self.bidder))
+
+        # Outbid past the maximum, the proxy stops answering
+        place_bid(self.listing, self.buyer, Decimal("45.00"))
+        self.listing.refresh_from_db()
+        self.assertEqual((self.listing.current_bid, self.listing.winning_user), (Decimal("45.00"), self.buyer))
+
+    def test_proxy_bid_view(self):
+        url = reverse("proxy_bid", args=[self.listing.id])
+        self.client.post(url, {"max_value": "5.00"})
+        self.assertFalse(ProxyBid.objects.exists())
+
+        self.client.post(url, {"max_value": "20.00"})
+        self.assertEqual(ProxyBid.objects.get(user=self.buyer).max_value, Decimal("20.00"))
+        self.assertContains(self.client.get(reverse("listing_details", args=[self.listing.id])), "$20.00")
+
+
+class SessionTests(AuctionsTestCase):
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(url)
+        return response, sum(1 for q in ctx.captured_queries if '"auctions_user"' in q["sql"])
+
+    @override_settings(USER_CACHE_TIMEOUT=60)
+    def test_cached_user(self):
+        self.assertEqual(self.user_queries(reverse("index"))[1], 1)
+        response, queries = self.user_queries(reverse("index"))
+        self.assertEqual(queries, 0)
+        self.assertContains(response, "Watchlist (1)")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            watchlists.toggle(self.buyer, self.listings[1].id)
+        self.assertContains(self.user_queries(reverse("index"))[0], "Watchlist (2)")
+
+        # A password change ends the session even though the old user was cached
+        with self.captureOnCommitCallbacks(execute=True):
+            self.buyer.set_password("changed")
+            self.buyer.save()
+        self.assertEqual(self.client.get(reverse("watchlist")).status_code, 302)
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies")
+    def test_signed_cookie_sessions(self):
+        self.client.force_login(self.buyer)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertContains(self.client.get(reverse("watchlist")), "buyer")
+        self.assertFalse(any("django_session" in q["sql"] for q in ctx.captured_queries))
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Pin the number of queries every page may run against a large seeded dataset.
+
+    The budgets do not depend on how many listings, bids or comments exist, so a
+    lazy load creeping into a template or view fails here rather than in
+    production.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = User.objects.create_user("seller", password="secret")
+        cls.buyers = User.objects.bulk_create([User(username=f"buyer{i}") for i in range(50)])
+        cls.buyer = cls.buyers[0]
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Category {i}", photo="categories/comics.jpg") for i in range(5)]
+        )
+        cls.category = categories[0]
+        listings = AuctionListing.objects.bulk_create([
+            AuctionListing(
+                name=f"Listing {i}", description="A listing " * 50, current_bid=Decimal("1.00"),
+                category=categories[i % len(categories)], listed_by=cls.seller, photo="listings/comics.jpg"
+            )
+            for i in range(300)
+        ])
+        cls.listing = listings[0]
+
+        bids = []
+        for i in range(3000):
+            # Concentrate a third of the bids on one hot listing
+            listing = cls.listing if i % 3 == 0 else listings[i % len(listings)]
+            bids.append(Bid(user=cls.buyers[i % len(cls.buyers)], listing=listing, value=Decimal(2 + i)))
+        Bid.objects.bulk_create(bids)
+        call_command("backfill_bid_summary", stdout=StringIO())
+
+        Comment.objects.bulk_create([
+            Comment(user=cls.buyers[i % len(cls.buyers)], listing=cls.listing, content=f"Comment {i}")
+            for i in range(1000)
+        ])
+        Watchlist.objects.bulk_create([Watchlist(user=cls.buyer, listing=listing) for listing in listings[:100]])
+        User.objects.filter(id=cls.buyer.id).update(watchlist_count=100)
+
+    def setUp(self):
+        cache.clear()
+
+    def assertMaxQueries(self, budget, url, method="get", data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data)
+        self.assertLess(response.status_code, 400)
+        self.assertLessEqual(
+            len(ctx.captured_queries), budget,
+            f"{method.upper()} {url} ran {len(ctx.captured_queries)} queries:\n"
+            + "\n".join(q["sql"] for q in ctx.captured_queries)
+        )
+
+    def test_anonymous_pages(self):
+        self.assertMaxQueries(1, reverse("index"))
+        self.assertMaxQueries(1, reverse("categories"))
+        self.assertMaxQueries(2, reverse("category_matches", args=[self.category.id]))
+        self.assertMaxQueries(2, reverse("listing_details", args=[self.listing.id]))
+        self.assertMaxQueries(0, reverse("login"))
+        self.assertMaxQueries(0, reverse("register"))
+
+    def test_signed_in_pages(self):
+        self.client.force_login(self.buyer)
+        self.assertMaxQueries(4, reverse("index"))
+        self.assertMaxQueries(3, reverse("categories"))
+        self.assertMaxQueries(5, reverse("category_matches", args=[self.category.id]))
+        self.assertMaxQueries(3, reverse("watchlist"))
+        self.assertMaxQueries(6, reverse("listing_details", args=[self.listing.id]))
+        self.assertMaxQueries(3, reverse("create"))
+
+    def test_writes(self):
+        # Budgets include the SAVEPOINT/RELEASE pair TestCase adds around each atomic block
+        self.client.force_login(self.buyer)
+        listing_id = self.listing.id
+        self.assertMaxQueries(9, reverse("bid", args=[listing_id]), "post", {"value": "100000"})
+        self.assertMaxQueries(6, reverse("comment", args=[listing_id]), "post", {"content": "Hi"})
+        self.assertMaxQueries(6, reverse("toggle_watchlist", args=[listing_id]), "post")
+        self.assertMaxQueries(10, reverse("toggle_watchlist", args=[listing_id]), "post")
+
+        self.client.force_login(self.seller)
+        self.assertMaxQueries(4, reverse("close_auction", args=[listing_id]), "post")
+
+
+class ThumbnailTests(AuctionsTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_upload_generates_thumbnails(self):
+        buffer = BytesIO()
+        Image.new("RGBA", (1000, 500), "red").save(buffer, "PNG")
+        photo = SimpleUploadedFile("photo.png", buffer.getvalue(), content_type="image/png")
+
+        self.client.post(reverse("create"), {
+            "name": "Lamp", "description": "A lamp", "current_bid": "5.00",
+            "category": self.category.id, "photo": photo
+        })
+
+        listing = AuctionListing.objects.get(name="Lamp")
+        for width in WIDTHS:
+            for ext in ("webp", "jpg"):
+                with default_storage.open(thumbnail_name(listing.photo.name, width, ext)) as f:
+                    self.assertEqual(Image.open(f).width, width)
+
+        response = self.client.get(reverse("index"))
+        self.assertContains(response, thumbnail_name(listing.photo.name, WIDTHS[0], "webp"))
+
+    def test_same_stem_different_extension(self):
+        field = AuctionListing._meta.get_field("photo")
+        names = {}
+        for ext, fmt, color in (("png", "PNG", "red"), ("jpg", "JPEG", "blue")):
+            buffer = BytesIO()
+            Image.new("RGB", (300, 300), color).save(buffer, fmt)
+            name = default_storage.save(f"listings/photo.{ext}", ContentFile(buffer.getvalue()))
+            make_thumbnails(field.attr_class(None, field, name), force=True)
+            names[color] = name
+
+        self.assertNotEqual(thumbnail_name(names["red"], WIDTHS[0], "jpg"), thumbnail_name(names["blue"], WIDTHS[0], "jpg"))
+        for color, name in names.items():
+            with default_storage.open(thumbnail_name(name, WIDTHS[0], "jpg")) as f:
+                red, _, blue = Image.open(f).convert("RGB").getpixel((0, 0))
+            self.assertEqual(red > blue, color == "red", name)
+
+
+class DatabaseTests(TestCase):
+    def test_router_sends_decorated_reads_to_replica(self):
+        router = ReadReplicaRouter()
+
+        def plain():
+            return router.db_for_read(AuctionListing)
+        decorated = read_from_replica(plain)
+
+        self.assertIsNone(decorated())
+        with mock.patch.dict(settings.DATABASES, {"replica": {}}):
+            self.assertEqual(decorated(), "replica")
+            self.assertIsNone(plain())
+            self.assertEqual(router.db_for_write(AuctionListing), "default")
+            self.assertFalse(router.allow_migrate("replica", "auctions"))
+
+    def test_new_connections_use_wal(self):
+        # A relative path, as AUCTIONS_DATABASE may give, has to work for the replica's file: URI too
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as root:
+            os.chdir(root)
+            try:
+                databases = ConnectionHandler(sqlite_databases("db.sqlite3", replica=True))
+                with databases["default"].cursor() as cursor:
+                    # Merely connecting leaves the file alone
+                    cursor.execute("PRAGMA journal_mode")
+                    self.assertEqual(cursor.fetchone()[0], "delete")
+                    cursor.execute("CREATE TABLE t (x)")
+                    cursor.execute("INSERT INTO t VALUES (1)")
+                enable_wal(databases["default"])
+                databases.close_all()
+
+                databases = ConnectionHandler(sqlite_databases("db.sqlite3", replica=True))
+                for alias in ("default", "replica"):
+                    with databases[alias].cursor() as cursor:
+                        cursor.execute("PRAGMA journal_mode")
+                        self.assertEqual(cursor.fetchone()[0], "wal", alias)
+                        cursor.execute("SELECT x FROM t")
+                        self.assertEqual(cursor.fetchall(), [(1,)])
+                databases.close_all()
+            finally:
+                os.chdir(cwd)
+
+
+class AssetTests(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        override = override_settings(
+            MEDIA_ROOT=f"{root}/media", STATIC_ROOT=f"{root}/static",
+            STORAGES={**settings.STORAGES, "staticfiles": {
+                "BACKEND": "commerce.assets.CompressedManifestStaticFilesStorage"
+            }}
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_media_revalidation_and_ranges(self):
+        default_storage.save("listings/clip.bin", BytesIO(bytes(range(100))))
+        url = f"{settings.MEDIA_URL}listings/clip.bin"
+
+        response = self.client.get(url)
+        self.assertEqual(b"".join(response.streaming_content), bytes(range(100)))
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+        with override_settings(MEDIA_CACHE_MAX_AGE=86400):
+            self.assertIn("max-age=86400", self.client.get(url)["Cache-Control"])
+
+        response = self.client.get(url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+        self.assertEqual(b"".join(response.streaming_content), bytes(range(10, 20)))
+        self.assertEqual(b"".join(self.client.get(url, HTTP_RANGE="bytes=-5").streaming_content), bytes(range(95, 100)))
+        self.assertEqual(self.client.get(url, HTTP_RANGE="bytes=100-").status_code, 416)
+        # A stale If-Range gets the whole, current file
+        self.assertEqual(self.client.get(url, HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"old"').status_code, 200)
+
+    def test_hashed_static_files(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.assertRegex(staticfiles_storage.url("auctions/styles.css"), assets.HASHED_NAME)
+
+        # Too small to be worth compressing
+        self.assertFalse(staticfiles_storage.exists(staticfiles_storage.stored_name("auctions/styles.css") + ".gz"))
+        url = staticfiles_storage.url("admin/css/base.css")
+
+        path = url[len(settings.STATIC_URL):]
+        request = RequestFactory().get(url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        response = assets.serve_static(request, path)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        with staticfiles_storage.open(path) as f:
+            self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), f.read())
+
+        # The unhashed copy can change under the same name
+        response = assets.serve_static(RequestFactory().get("/"), "admin/css/base.css")
+        self.assertNotIn("immutable", response["Cache-Control"])
+        self.assertIn(f"max-age={settings.UNHASHED_STATIC_CACHE_MAX_AGE}", response["Cache-Control"])
+
+
+class ListingCardTests(AuctionsTestCase):
+    def test_summary_matches_truncatechars(self):
+        for text in ("Short", "x" * 300, "x" * 301, "e\u0301" * 301):
+            self.assertEqual(summary(text), Truncator(text).chars(300))
+
+    def test_feeds_share_the_card(self):
+        AuctionListing.objects.filter(id=self.listing.id).update(ends_at=timezone.now() + timedelta(days=1))
+        url = reverse("listing_details", args=[self.listing.id])
+        for page in (reverse("index"), reverse("watchlist"), reverse("category_matches", args=[self.category.id])):
+            self.assertContains(self.client.get(page), f'href="{url}"')
+        self.assertContains(self.client.get(reverse("category_matches", args=[self.category.id])), "Ends ")
+        self.assertNotContains(self.client.get(reverse("index")), "Ends ")
+
+
+class FragmentCacheTests(AuctionsTestCase):
+    def setUp(self):
+        super().setUp()
+        caching.stats.reset()
+
+    def test_bid_invalidates_cached_fragments(self):
+        url = reverse("listing_details", args=[self.listing.id])
+        self.client.get(url)
+        self.assertContains(self.client.get(url), "$11.00")
+        self.assertEqual(caching.stats.snapshot()["bid_summary"], {"hits": 1, "misses": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            place_bid(self.listing, self.bidder, Decimal("20.00"))
+
+        response = self.client.get(url)
+        self.assertContains(response, "2</span> bid(s) so far.")
+        self.assertEqual(caching.stats.snapshot()["bid_summary"], {"hits": 1, "misses": 2})
+
+    def test_comment_invalidates_comments_fragment(self):
+        url = reverse("listing_details", args=[self.listing.id])
+        self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("comment", args=[self.listing.id]), {"content": "Still available?"})
+        self.assertContains(self.client.get(url), "Still available?")
+
+    def test_rejected_writes_leave_fragments_alone(self):
+        url = reverse("listing_details", args=[self.listing.id])
+        for response in (
+            self.client.get(reverse("bid", args=[self.listing.id])),
+            self.client.post(reverse("bid", args=[self.listing.id]), {"value": "not a number"}),
+            self.client.post(reverse("comment", args=[self.listing.id]), {"content": ""}),
+        ):
+            self.assertIn(response.status_code, (302, 405))
+        self.assertContains(self.client.get(url), "Nice")
+        self.assertNotContains(self.client.get(url), "No comments.")
+
+    def test_stats_are_staff_only(self):
+        self.assertEqual(self.client.get(reverse("cache_stats")).status_code, 302)
+
+
+class SearchTests(AuctionsTestCase):
+    def test_search_ranks_name_matches_first(self):
+        AuctionListing.objects.create(
+            name="Oak table", description="Solid wood", current_bid=Decimal("50.00"),
+            category=self.category, listed_by=self.seller
+        )
+        AuctionListing.objects.create(
+            name="Chair", description="Matches the oak table", current_bid=Decimal("20.00"),
+            category=self.category, listed_by=self.seller
+        )
+
+        listings, has_next = search_listings("oak")
+        self.assertEqual([listing.name for listing in listings], ["Oak table", "Chair"])
+        self.assertFalse(has_next)
+
+    def test_index_follows_edits_and_closing(self):
+        listing = self.listings[1]
+        listing.name = "Vintage camera"
+        listing.save()
+        self.assertEqual(search_listings("camera")[0], [listing])
+
+        AuctionListing.objects.filter(id=listing.id).update(is_active=False)
+        self.assertEqual(search_listings("camera")[0], [])
+        self.assertEqual(search_listings("camera", active_only=False)[0], [listing])
+
+        listing.delete()
+        self.assertEqual(search_listings("camera", active_only=False)[0], [])
+
+    def test_search_page(self):
+        response = self.client.get(reverse("search"), {"q": "listing 3", "category": self.category.id})
+        self.assertContains(response, "Listing 3")
+        self.assertNotContains(response, "Listing 2")
+
+
+class CloseAuctionsTests(AuctionsTestCase):
+    def test_closes_due_auctions_once(self):
+        now = timezone.now()
+        due, later = self.listings[0], self.listings[1]
+        AuctionListing.objects.filter(id=due.id).update(ends_at=now - timedelta(minutes=1))
+        AuctionListing.objects.filter(id=later.id).update(ends_at=now + timedelta(days=1))
+
+        self.assertEqual(close_due_auctions(now, batch_size=1), 1)
+        self.assertEqual(close_due_auctions(now), 0)
+
+        due.refresh_from_db()
+        later.refresh_from_db()
+        self.assertFalse(due.is_active)
+        self.assertEqual(due.winning_user, self.buyer)
+        self.assertTrue(later.is_active)
+
+    def test_due_query_uses_index(self):
+        with connection.cursor() as cursor:
+            sql, params = (
+                AuctionListing.objects.filter(is_active=True, ends_at__lte=timezone.now())
+                .order_by("ends_at").values("id").query.sql_with_params()
+            )
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("active_listing_ends_idx", plan)
+
+    def test_bids_rejected_after_end(self):
+        self.listing.ends_at = timezone.now() - timedelta(seconds=1)
+        with self.assertRaises(ListingClosed):
+            place_bid(self.listing, self.bidder, Decimal("100.00"))
+
+
+class ImportExportTests(AuctionsTestCase):
+    def test_round_trip(self):
+        AuctionListing.objects.filter(id=self.listings[1].id).update(is_active=False)
+        expected = sorted(AuctionListing.objects.values_list("name", "listed_by__username", "category__name", "is_active"))
+        self.assertIn(("Listing 1", "seller", "Books", False), expected)
+
+        for ext in ("jsonl", "csv"):
+            with tempfile.TemporaryDirectory() as directory:
+                path = f"{directory}/listings.{ext}"
+                call_command("export_listings", path, stdout=StringIO(), stderr=StringIO())
+                AuctionListing.objects.all().delete()
+
+                out = StringIO()
+                call_command("import_listings", path, stdout=out, batch_size=2)
+
+            self.assertIn("Imported 5 listing(s), skipped 0", out.getvalue())
+            self.assertEqual(
+                sorted(AuctionListing.objects.values_list("name", "listed_by__username", "category__name", "is_active")),
+                expected
+            )
+
+    def test_bad_json_line_is_skipped(self):
+        good = {"name": "Imported", "current_bid": "5.00", "category": "Books", "listed_by": "seller"}
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/listings.jsonl"
+            with open(path, "w") as f:
+                f.write(f'{json.dumps(good)}\n{{"name": "Broken",\n[1, 2]\n{json.dumps(good)}\n')
+            out, err = StringIO(), StringIO()
+            call_command("import_listings", path, stdout=out, stderr=err)
+
+        self.assertIn("Imported 2 listing(s), skipped 2", out.getvalue())
+        self.assertIn("Row 2 skipped: invalid JSON", err.getvalue())
+        self.assertIn("Row 3 skipped: not a JSON object", err.getvalue())
+        self.assertEqual(AuctionListing.objects.filter(name="Imported").count(), 2)
+
+
+@override_settings(MIDDLEWARE=["auctions.middleware.PerformanceMiddleware", *settings.MIDDLEWARE])
+class PerformanceMiddlewareTests(AuctionsTestCase):
+    def setUp(self):
+        super().setUp()
+        performance.histograms.reset()
+
+    def test_server_timing_and_histograms(self):
+        response = self.client.get(reverse("listing_details", args=[self.listing.id]))
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", tpl;dur=[\d.]+, total;dur=[\d.]+$')
+
+        stats = performance.histograms.snapshot()["listing_details"]
+        self.assertEqual(stats["count"], 1)
+        self.assertGreater(stats["mean_queries"], 0)
+        self.assertGreater(stats["mean_template_ms"], 0)
+        self.assertEqual(stats["mean_bytes"], len(response.content))
+
+    def test_slow_requests_are_logged_with_sql(self):
+        with mock.patch("auctions.middleware.SLOW_REQUEST_MS", 0), self.assertLogs("auctions.performance") as logs:
+            self.client.get(reverse("index"))
+        self.assertIn("auctions_auctionlisting", logs.output[0])
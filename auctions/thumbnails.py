@@ -0,0 +1,76 @@
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models
+from PIL import Image, ImageOps
+
+
+# Widths of the derivatives generated for every uploaded photo
+WIDTHS = getattr(settings, "THUMBNAIL_WIDTHS", (200, 400, 800))
+QUALITY = getattr(settings, "THUMBNAIL_QUALITY", 80)
+FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+
+
+def thumbnail_name(name, width, ext):
+    """listings/photo.png -> listings/thumbs/photo.png-400w.webp"""
+    # Keeping the original extension stops photo.png and photo.jpg sharing thumbnails
+    directory, filename = posixpath.split(name)
+    return posixpath.join(directory, "thumbs", f"{filename}-{width}w.{ext}")
+
+
+def make_thumbnails(fieldfile, force=False):
+    """
+    Write resized WebP and JPEG copies of `fieldfile` next to it in `thumbs/`.
+
+    Images are rotated according to their EXIF orientation and then
+    re-encoded without any metadata. Images are never upscaled. Returns the
+    number of files written.
+    """
+    storage = fieldfile.storage
+    if not force and storage.exists(thumbnail_name(fieldfile.name, WIDTHS[-1], "webp")):
+        return 0
+
+    with storage.open(fieldfile.name, "rb") as f:
+        original = ImageOps.exif_transpose(Image.open(f))
+        original.load()
+
+    # JPEG has no alpha channel; flatten transparent screenshots onto white
+    if original.mode in ("RGBA", "LA", "P"):
+        original = original.convert("RGBA")
+        flat = Image.new("RGB", original.size, "white")
+        flat.paste(original, mask=original.getchannel("A"))
+        original = flat
+    elif original.mode != "RGB":
+        original = original.convert("RGB")
+
+    written = 0
+    for width in WIDTHS:
+        image = original.copy()
+        image.thumbnail((width, width * 10), Image.LANCZOS)
+        for ext, fmt in FORMATS.items():
+            buffer = BytesIO()
+            image.save(buffer, fmt, quality=QUALITY, optimize=True)
+            name = thumbnail_name(fieldfile.name, width, ext)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+            written += 1
+    return written
+
+
+def has_thumbnails(fieldfile):
+    return bool(fieldfile) and fieldfile.storage.exists(thumbnail_name(fieldfile.name, WIDTHS[-1], "webp"))
+
+
+class ThumbnailImageField(models.ImageField):
+    """An ImageField that generates its thumbnails when a new file is uploaded."""
+
+    def pre_save(self, model_instance, add):
+        file = getattr(model_instance, self.attname)
+        uploaded = bool(file) and not file._committed
+        file = super().pre_save(model_instance, add)
+        if uploaded:
+            make_thumbnails(file, force=True)
+        return file
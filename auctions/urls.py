@@ -1,8 +1,6 @@
 from django.urls import path
-from django.conf import settings
-from django.conf.urls.static import static
 
-from . import views
+from . import api, views
 
 urlpatterns = [
     path("", views.index, name="index"),
@@ -10,15 +8,26 @@ urlpatterns = [
     path("logout", views.logout_view, name="logout"),
     path("register", views.register, name="register"),
     path("categories", views.categories, name="categories"),
+    path("search", views.search, name="search"),
     path("categories/<int:category_id>", views.category_matches, name="category_matches"),
     path("listing/<int:listing_id>", views.listing_details, name="listing_details"),
     path("create", views.create, name="create"),
     path("watchlist", views.watchlist, name="watchlist"),
+    path("watchlist/batch", views.watchlist_batch, name="watchlist_batch"),
+    path("watchlist/membership", views.watchlist_membership, name="watchlist_membership"),
     path("listing/<int:listing_id>/toggle_watchlist", views.toggle_watchlist, name='toggle_watchlist'),
     path("listing/<int:listing_id>/comment", views.comment, name='comment'),
+    path("listing/<int:listing_id>/comments", views.listing_comments, name="listing_comments"),
     path("listing/<int:listing_id>/bid", views.bid, name="bid"),
-    path("listing/<int:listing_id>/close_auction", views.close_auction, name="close_auction")
+    path("listing/<int:listing_id>/proxy_bid", views.proxy_bid, name="proxy_bid"),
+    path("listing/<int:listing_id>/close_auction", views.close_auction, name="close_auction"),
+    path("listing/<int:listing_id>/events", views.listing_events, name="listing_events"),
+    path("cache-stats", views.cache_stats, name="cache_stats"),
+    path("performance-stats", views.performance_stats, name="performance_stats"),
+    path("analytics/daily", views.daily_report, name="daily_report"),
+    path("api/v1/listings", api.listings, name="api_listings"),
+    path("api/v1/listings/<int:listing_id>", api.listing, name="api_listing"),
+    path("api/v1/listings/<int:listing_id>/bids", api.listing_bids, name="api_listing_bids"),
+    path("api/v1/listings/<int:listing_id>/price-history", api.listing_price_history, name="api_listing_price_history"),
+    path("api/v1/categories", api.categories, name="api_categories")
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
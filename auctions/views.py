@@ -1,19 +1,77 @@
+import asyncio
+import functools
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.db import IntegrityError
-from django.db.models import Max
-from django.http import HttpResponse, HttpResponseRedirect
+from django.contrib.auth.views import redirect_to_login
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
-
-from .models import User, AuctionListing, Category, Watchlist, Comment, Bid
-from . import forms
-
-
-def index(request):
-    return render(request, "auctions/index.html", {
-        "listings": AuctionListing.objects.filter(is_active=True)
+from django.utils import timezone
+from django.views.decorators.http import require_GET, require_POST
+
+from commerce.database import read_from_replica
+
+from .models import User, AuctionListing, Category, Watchlist, Comment, ProxyBid
+from .bidding import place_bid, set_proxy_bid, BidRejected
+from .caching import attach_versions
+from .pagination import COMMENTS_PAGE_SIZE, MAX_ID, NEWEST, akeyset_page, keyset_page
+from .ratelimit import rate_limit
+from .search import search_listings
+from . import analytics, caching, events, forms, performance, watchlists
+
+
+# The read-heavy pages are async: ORM calls go through the async interfaces,
+# independent ones run together with asyncio.gather, and only rendering (which
+# may fill a cached fragment from the database) is handed to a thread.
+
+async def _auser(request):
+    # Loading the user reads the session and the user row; Django 4.2 has no request.auser()
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+async def _arender(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+def alogin_required(view):
+    """login_required for async views (Django 4.2's only wraps sync ones)."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if not (await _auser(request)).is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def _feed(request, listings, ordering=NEWEST):
+    """One page of `listings` with cache versions attached, the ids the user watches and the next cursor."""
+    user, (listings, next_cursor) = await asyncio.gather(
+        _auser(request), akeyset_page(listings, request.GET.get('after'), ordering=ordering)
+    )
+    listings, watched = await asyncio.gather(
+        sync_to_async(attach_versions)(listings),
+        watchlists.awatched_ids(user, [listing.id for listing in listings])
+    )
+    return listings, watched, next_cursor
+
+
+@read_from_replica
+async def index(request):
+    listings, watched, next_cursor = await _feed(request, AuctionListing.objects.cards().filter(is_active=True))
+    return await _arender(request, "auctions/index.html", {
+        "listings": listings,
+        "watched": watched,
+        "next_cursor": next_cursor
     })
 
 
@@ -69,53 +127,152 @@ def register(request):
         return render(request, "auctions/register.html")
 
 
-def categories(request):
-    return render(request, 'auctions/categories.html', {
-        'categories': Category.objects.all()
+@read_from_replica
+async def categories(request):
+    _, categories = await asyncio.gather(
+        _auser(request), sync_to_async(caching.category_summaries)()
+    )
+    return await _arender(request, 'auctions/categories.html', {
+        'categories': categories
     })
 
 
-def category_matches(request, category_id):
-    category = get_object_or_404(Category, id=category_id)
-    listings = AuctionListing.objects.filter(category=category)
-
-    return render(request, 'auctions/category_matches.html', {
+@read_from_replica
+async def category_matches(request, category_id):
+    form = forms.CategoryFilterForm(request.GET)
+    if not form.is_valid():
+        raise Http404("Invalid sort.")
+
+    listings = AuctionListing.objects.cards().filter(category_id=category_id)
+    if not form.cleaned_data['include_closed']:
+        listings = listings.filter(is_active=True)
+    if form.cleaned_data['sort'] == 'ending':
+        # Listings without an end time never end
+        listings = listings.filter(ends_at__isnull=False)
+
+    category, (listings, watched, next_cursor) = await asyncio.gather(
+        Category.objects.filter(id=category_id).afirst(),
+        _feed(request, listings, form.ordering())
+    )
+    if category is None:
+        raise Http404("No such category.")
+
+    next_query = None
+    if next_cursor:
+        params = request.GET.copy()
+        params['after'] = next_cursor
+        next_query = params.urlencode()
+
+    return await _arender(request, 'auctions/category_matches.html', {
         'category': category,
-        'listings': listings
+        'form': form,
+        'listings': listings,
+        'watched': watched,
+        'next_query': next_query
     })
 
 
-def listing_details(request, listing_id):
-    listing = get_object_or_404(AuctionListing, id=listing_id)
+def search(request):
+    form = forms.SearchForm(request.GET or None)
+    listings, has_next, page = [], False, 1
+
+    if form.is_valid():
+        category = form.cleaned_data['category']
+        page = form.cleaned_data['page'] or 1
+        listings, has_next = search_listings(
+            form.cleaned_data['q'],
+            category_id=category.id if category else None,
+            active_only=not form.cleaned_data['include_closed'],
+            page=page
+        )
+
+    next_query = None
+    if has_next:
+        params = request.GET.copy()
+        params['page'] = page + 1
+        next_query = params.urlencode()
+
+    return render(request, 'auctions/search.html', {
+        'form': form,
+        'listings': attach_versions(listings),
+        'watched': watchlists.watched_ids(request.user, [listing.id for listing in listings]),
+        'next_query': next_query
+    })
+
+
+@read_from_replica
+async def listing_details(request, listing_id):
+    # The bid summary comes with the listing row
+    user, listing = await asyncio.gather(
+        _auser(request),
+        AuctionListing.objects.select_related('highest_bid__user', 'listed_by', 'winning_user', 'category')
+        .filter(id=listing_id).afirst()
+    )
+    if listing is None:
+        raise Http404("No such listing.")
 
     # Watchlist logic
-    if request.user.is_authenticated:
-        in_watchlist = Watchlist.objects.filter(user=request.user, listing=listing).exists()
+    if user.is_authenticated:
+        in_watchlist, proxy_max, _ = await asyncio.gather(
+            Watchlist.objects.filter(user=user, listing=listing).aexists(),
+            ProxyBid.objects.filter(user=user, listing=listing).values_list('max_value', flat=True).afirst(),
+            sync_to_async(attach_versions)([listing])
+        )
         bid_form = forms.CreateBidForm()
+        proxy_bid_form = forms.ProxyBidForm()
         comment_form = forms.CreateCommentForm()
     else:
+        await sync_to_async(attach_versions)([listing])
         in_watchlist = False
+        proxy_max = None
         bid_form = None
+        proxy_bid_form = None
         comment_form = None
 
-    # Bids logic
-    bids = Bid.objects.filter(listing=listing)
-    highest_bid = bids.aggregate(Max('value'))['value__max']
-    current_highest_bid = None
-    if highest_bid:
-        current_highest_bid = bids.get(value=highest_bid)
+    # Comments logic (the template calls this only when the cached fragment is missing)
+    def comment_page():
+        comments, next_cursor = _comment_page(listing.id)
+        return {'comments': comments, 'next_cursor': next_cursor}
 
-    # Comments logic
-    comments = Comment.objects.filter(listing=listing)
+    is_leading = listing.highest_bid is not None and listing.highest_bid.user_id == user.id
 
-    return render(request, 'auctions/listing_details.html', {
+    return await _arender(request, 'auctions/listing_details.html', {
         'listing': listing,
         'in_watchlist': in_watchlist,
-        'comments': comments,
-        'bids': bids,
-        'current_highest_bid': current_highest_bid,
+        'comment_page': comment_page,
+        'current_highest_bid': listing.highest_bid,
+        'is_leading': is_leading,
         'comment_form': comment_form,
-        'bid_form': bid_form
+        'bid_form': bid_form,
+        'proxy_bid_form': proxy_bid_form,
+        'proxy_max': proxy_max,
+        'live_updates': events.streaming_supported(request)
+    })
+
+
+def _comment_page(listing_id, cursor=None):
+    comments = (
+        Comment.objects.filter(listing_id=listing_id)
+        .select_related('user')
+        .only('content', 'datetime_submitted', 'user__username')
+    )
+    return keyset_page(comments, cursor, page_size=COMMENTS_PAGE_SIZE)
+
+
+@read_from_replica
+def listing_comments(request, listing_id):
+    comments, next_cursor = _comment_page(listing_id, request.GET.get('after'))
+    return JsonResponse({
+        'comments': [
+            {
+                'id': comment.id,
+                'user': comment.user.username,
+                'content': comment.content,
+                'datetime_submitted': comment.datetime_submitted
+            }
+            for comment in comments
+        ],
+        'next_cursor': next_cursor
     })
 
 
@@ -137,84 +294,171 @@ def create(request):
     })
 
 
-@login_required
-def watchlist(request):
-    listings = AuctionListing.objects.filter(watchlist__user=request.user)
-    return render(request, 'auctions/watchlist.html', {
-        'watchlist': listings
+@alogin_required
+async def watchlist(request):
+    listings, next_cursor = await akeyset_page(
+        AuctionListing.objects.cards().filter(watchlist__user=request.user), request.GET.get('after')
+    )
+    return await _arender(request, 'auctions/watchlist.html', {
+        'watchlist': await sync_to_async(attach_versions)(listings),
+        'next_cursor': next_cursor
     })
 
 
 @login_required
 def toggle_watchlist(request, listing_id):
+    if watchlists.toggle(request.user, listing_id) is None:
+        raise Http404("No such listing.")
+    return redirect('listing_details', listing_id)
+
+
+def _listing_ids(values):
+    """Parse a list of listing ids, raising ValueError on anything else."""
+    if not isinstance(values, list) or len(values) > watchlists.MAX_BATCH_SIZE:
+        raise ValueError
+    ids = [int(value) for value in values]
+    # Past MAX_ID the query itself would fail
+    if any(not 1 <= listing_id <= MAX_ID for listing_id in ids):
+        raise ValueError
+    return ids
+
+
+@login_required
+@require_POST
+def watchlist_batch(request):
+    try:
+        payload = json.loads(request.body)
+        add = _listing_ids(payload.get('add', []))
+        remove = _listing_ids(payload.get('remove', []))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({'error': 'Expected {"add": [ids], "remove": [ids]}.'}, status=400)
+
+    count = watchlists.update(request.user, add=add, remove=remove)
+    return JsonResponse({
+        'watched': sorted(watchlists.watched_ids(request.user, add + remove)),
+        'count': count
+    })
+
+
+@login_required
+@require_GET
+def watchlist_membership(request):
+    try:
+        ids = _listing_ids([value for value in request.GET.get('ids', '').split(',') if value])
+    except ValueError:
+        return JsonResponse({'error': 'Expected ids=1,2,3.'}, status=400)
+
+    return JsonResponse({'watched': sorted(watchlists.watched_ids(request.user, ids))})
+
+
+@login_required
+@rate_limit('bid')
+@require_POST
+def bid(request, listing_id):
+    # Errors go back to the listing page as messages: rendering it here, without
+    # the rest of its context, would cache empty fragments for every visitor
     listing = get_object_or_404(AuctionListing, id=listing_id)
-    watchlist_item = Watchlist.objects.filter(user=request.user, listing=listing).first()
+    bid_form = forms.CreateBidForm(request.POST)
 
-    if watchlist_item:
-        watchlist_item.delete()
+    if bid_form.is_valid():
+        try:
+            place_bid(listing, request.user, bid_form.cleaned_data['value'])
+        except BidRejected as e:
+            messages.error(request, str(e))
     else:
-        Watchlist.objects.create(user=request.user, listing=listing)
-    
+        messages.error(request, 'Enter a valid bid.')
     return redirect('listing_details', listing_id)
 
 
 @login_required
-def bid(request, listing_id):
+@rate_limit('bid')
+@require_POST
+def proxy_bid(request, listing_id):
     listing = get_object_or_404(AuctionListing, id=listing_id)
+    proxy_bid_form = forms.ProxyBidForm(request.POST)
 
-    if request.method == "POST":
-        bid_form = forms.CreateBidForm(request.POST)
-
-        if bid_form.is_valid():
-            bid_value = bid_form.cleaned_data['value']
-
-            if bid_value > listing.current_bid:
-                bid = bid_form.save(commit=False)
-                bid.user = request.user
-                bid.listing = listing
-                bid.save()
-                
-                # Update listing
-                listing.current_bid = bid.value
-                listing.winning_user = request.user
-                listing.save()
-
-                return redirect('listing_details', listing_id)
-            else:
-                messages.error(request, "Your bid must be higher than the current bid.")
-                return redirect('listing_details', listing_id)
+    if proxy_bid_form.is_valid():
+        try:
+            set_proxy_bid(listing, request.user, proxy_bid_form.cleaned_data['max_value'])
+        except BidRejected as e:
+            messages.error(request, str(e))
     else:
-        bid_form = forms.CreateBidForm()
-
-    return render(request, 'auctions/listing_details.html', {
-        'listing': listing,
-        'bid_form': bid_form,
-    })
+        messages.error(request, 'Enter a valid maximum bid.')
+    return redirect('listing_details', listing_id)
 
 
 @login_required
+@rate_limit('comment')
+@require_POST
 def comment(request, listing_id):
-    if request.method == "POST":
-        comment_form = forms.CreateCommentForm(request.POST)
-
-        if comment_form.is_valid():
-            listing = get_object_or_404(AuctionListing, id=listing_id)
-            comment = comment_form.save(commit=False)
-            comment.user = request.user
-            comment.listing = listing
+    comment_form = forms.CreateCommentForm(request.POST)
+
+    if comment_form.is_valid():
+        comment = comment_form.save(commit=False)
+        comment.user = request.user
+        comment.listing_id = listing_id
+        with transaction.atomic():
+            # Bumping the count doubles as the existence check
+            if not AuctionListing.objects.filter(id=listing_id).update(
+                comment_count=F('comment_count') + 1, updated_at=timezone.now()
+            ):
+                raise Http404("No such listing.")
             comment.save()
-            return redirect('listing_details', listing_id)
     else:
-        comment_form = forms.CreateCommentForm()
-    
-    return render(request, 'auctions/listing_details.html', {
-        'comment_form': comment_form
-    })
+        messages.error(request, 'Enter a comment.')
+    return redirect('listing_details', listing_id)
 
 
 @login_required
 def close_auction(request, listing_id):
-    listing = get_object_or_404(AuctionListing, id=listing_id)
+    listing = get_object_or_404(AuctionListing.objects.select_related('winning_user'), id=listing_id)
     listing.is_active = False
-    listing.save()
-    return redirect('index')
\ No newline at end of file
+    listing.save(update_fields=['is_active', 'updated_at'])
+    events.publish(listing.id, "closed", winning_user=listing.winning_user.username if listing.winning_user else None)
+    return redirect('index')
+
+
+@staff_member_required
+def cache_stats(request):
+    return JsonResponse(caching.stats.snapshot())
+
+
+@staff_member_required
+def performance_stats(request):
+    return JsonResponse(performance.histograms.snapshot())
+
+
+@staff_member_required
+def daily_report(request):
+    try:
+        days = min(int(request.GET.get('days', 30)), 366)
+    except ValueError:
+        return JsonResponse({'error': 'days must be an integer.'}, status=400)
+    category = request.GET.get('category') or None
+    if category is not None:
+        try:
+            category = int(category)
+        except ValueError:
+            return JsonResponse({'error': 'category must be an integer.'}, status=400)
+        if not 1 <= category <= MAX_ID:
+            return JsonResponse({'error': 'category must be a valid id.'}, status=400)
+
+    since = timezone.now().date() - timedelta(days=days - 1)
+    return JsonResponse({
+        'high_water_mark': analytics.high_water_mark(),
+        'days': analytics.daily_stats(since, category)
+    })
+
+
+async def listing_events(request, listing_id):
+    if not events.streaming_supported(request):
+        # 204 tells EventSource not to reconnect
+        return HttpResponse(status=204)
+    if not await AuctionListing.objects.filter(id=listing_id).aexists():
+        raise Http404("No such listing.")
+
+    response = StreamingHttpResponse(events.stream(listing_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
\ No newline at end of file
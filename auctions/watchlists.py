@@ -0,0 +1,86 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .auth import invalidate_user
+from .models import User, AuctionListing, Watchlist
+
+# Upper bound on ids accepted per batch or membership request
+MAX_BATCH_SIZE = 500
+
+
+def watched_ids(user, listing_ids):
+    """Return the subset of `listing_ids` that `user` watches, with one IN query."""
+    if not user.is_authenticated or not listing_ids:
+        return set()
+    return set(
+        Watchlist.objects.filter(user=user, listing_id__in=listing_ids).values_list("listing_id", flat=True)
+    )
+
+
+async def awatched_ids(user, listing_ids):
+    """watched_ids() for async views."""
+    if not user.is_authenticated or not listing_ids:
+        return set()
+    return {
+        listing_id async for listing_id
+        in Watchlist.objects.filter(user=user, listing_id__in=listing_ids).values_list("listing_id", flat=True)
+    }
+
+
+def _adjust_count(user, delta):
+    users = User.objects.filter(id=user.id)
+    if delta < 0:
+        # Rows added outside this module (admin, fixtures) aren't counted; never go negative
+        users = users.filter(watchlist_count__gte=-delta)
+    if users.update(watchlist_count=F("watchlist_count") + delta):
+        user.watchlist_count += delta
+        invalidate_user(user.id)
+
+
+def toggle(user, listing_id):
+    """
+    Add the listing to the user's watchlist, or remove it if it is already there.
+
+    Returns whether the listing is now watched, or None if there is no such listing.
+    """
+    with transaction.atomic():
+        # The (user, listing) pair is unique, so removing is a single DELETE
+        deleted, _ = Watchlist.objects.filter(user=user, listing_id=listing_id).delete()
+        if deleted:
+            _adjust_count(user, -1)
+            return False
+
+    if not AuctionListing.objects.filter(id=listing_id).exists():
+        return None
+    try:
+        with transaction.atomic():
+            Watchlist.objects.create(user=user, listing_id=listing_id)
+            _adjust_count(user, 1)
+    except IntegrityError:
+        # A concurrent request already added it
+        pass
+    return True
+
+
+def update(user, add=(), remove=()):
+    """
+    Add and remove many listings in one transaction. Unknown listing ids are ignored.
+
+    Returns the number of listings the user watches afterwards.
+    """
+    add = set(add) - set(remove)
+    with transaction.atomic():
+        if remove:
+            Watchlist.objects.filter(user=user, listing_id__in=remove).delete()
+        if add:
+            existing = AuctionListing.objects.filter(id__in=add).values_list("id", flat=True)
+            Watchlist.objects.bulk_create(
+                [Watchlist(user=user, listing_id=listing_id) for listing_id in existing],
+                ignore_conflicts=True
+            )
+        # Recount rather than track deltas: ignored conflicts aren't reported
+        count = Watchlist.objects.filter(user=user).count()
+        User.objects.filter(id=user.id).update(watchlist_count=count)
+    user.watchlist_count = count
+    invalidate_user(user.id)
+    return count
@@ -0,0 +1,207 @@
+"""
+Static and media file serving for running the site without a separate web
+server in front of it.
+
+Static files go through `CompressedManifestStaticFilesStorage`: collectstatic
+writes every file under a content-hashed name (styles.3f2a9c1b04de.css), so
+a changed file gets a new URL and the old one can be cached forever, and
+stores gzip (and, when the `brotli` package is installed, brotli) copies of
+the text assets next to it. `serve()` answers with the best compressed copy
+the client accepts, an ETag and Last-Modified for revalidation, single byte
+ranges for resumed downloads and seeking, and far-future Cache-Control
+headers on hashed names. Files are streamed with FileResponse, which hands
+them to the server's sendfile where there is one.
+
+The STATIC_CACHE_MAX_AGE, UNHASHED_STATIC_CACHE_MAX_AGE, MEDIA_CACHE_MAX_AGE,
+SERVE_STATIC and SERVE_MEDIA settings control all of this; see
+`urlpatterns()`.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.urls import re_path
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Only text compresses well; images and fonts already are compressed
+COMPRESSIBLE = {".css", ".js", ".mjs", ".map", ".svg", ".json", ".txt", ".html", ".xml", ".ico"}
+MIN_COMPRESS_SIZE = 256
+# Content-Encoding -> suffix of the precompressed copy, best first
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+CHUNK_SIZE = 64 * 1024
+
+
+def compress(content):
+    """Return {suffix: bytes} for every encoding that makes `content` smaller."""
+    variants = {".gz": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(content, quality=11)
+    return {suffix: data for suffix, data in variants.items() if len(data) < len(content)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes precompressed copies of hashed text files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in self.hashed_files.values():
+            if os.path.splitext(name)[1] not in COMPRESSIBLE:
+                continue
+            with self.open(name) as f:
+                content = f.read()
+            if len(content) < MIN_COMPRESS_SIZE:
+                continue
+            for suffix, data in compress(content).items():
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(data))
+
+
+def _byte_range(header, size):
+    """
+    Parse a Range header into (start, end) inclusive, None to send the whole
+    file, or False if it can't be satisfied. Multiple ranges are answered
+    with the whole file, as RFC 9110 allows.
+    """
+    match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # bytes=-500 is the last 500 bytes
+        if not int(last) or not size:
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    if start >= size:
+        return False
+    if last and int(last) < start:
+        return None
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+@require_safe
+def serve(request, path, document_root, max_age=0, immutable=False, precompressed=False):
+    """
+    Serve `path` from `document_root`, cacheable for `max_age` seconds.
+
+    Without `immutable`, clients revalidate with the ETag once `max_age` has
+    passed. With `precompressed`, a .br or .gz copy next to the file is sent
+    instead when the client accepts that encoding.
+    """
+    try:
+        full_path = safe_join(document_root, path)
+    except ValueError:
+        raise Http404("No such file.")
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("No such file.")
+    if not os.path.isfile(full_path):
+        raise Http404("No such file.")
+
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+
+    # Ranges address the identity encoding, so only whole responses get a compressed copy
+    range_header = request.headers.get("Range")
+    encoding = None
+    if precompressed and not range_header:
+        accepted = {token.split(";")[0].strip() for token in request.headers.get("Accept-Encoding", "").split(",")}
+        for name, suffix in ENCODINGS.items():
+            if name in accepted and os.path.isfile(full_path + suffix):
+                encoding = name
+                full_path += suffix
+                stat = os.stat(full_path)
+                etag = f'{etag[:-1]}-{name}"'
+                break
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        byte_range = None
+        if range_header:
+            if_range = request.headers.get("If-Range")
+            if not if_range or if_range == etag or parse_http_date_safe(if_range) == last_modified:
+                byte_range = _byte_range(range_header, stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+        elif byte_range:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                _read_range(full_path, start, end - start + 1), status=206, content_type=content_type
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            response["Content-Length"] = end - start + 1
+        else:
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
+            response["Content-Length"] = stat.st_size
+        if encoding:
+            response["Content-Encoding"] = encoding
+
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    if precompressed:
+        patch_vary_headers(response, ["Accept-Encoding"])
+    if immutable:
+        patch_cache_control(response, public=True, max_age=max_age, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def serve_static(request, path):
+    # A hashed name always has the same content, so it never needs revalidating
+    hashed = bool(HASHED_NAME.search(path))
+    return serve(
+        request, path, settings.STATIC_ROOT,
+        max_age=settings.STATIC_CACHE_MAX_AGE if hashed else settings.UNHASHED_STATIC_CACHE_MAX_AGE,
+        immutable=hashed, precompressed=True
+    )
+
+
+def serve_media(request, path):
+    # Thumbnails are regenerated under the same names, so media is never immutable
+    return serve(request, path, settings.MEDIA_ROOT, max_age=settings.MEDIA_CACHE_MAX_AGE)
+
+
+def urlpatterns():
+    """URL patterns for whichever of SERVE_STATIC and SERVE_MEDIA are on."""
+    patterns = []
+    if getattr(settings, "SERVE_STATIC", False):
+        patterns.append(re_path(rf"^{re.escape(settings.STATIC_URL.lstrip('/'))}(?P<path>.+)$", serve_static))
+    if getattr(settings, "SERVE_MEDIA", False):
+        patterns.append(re_path(rf"^{re.escape(settings.MEDIA_URL.lstrip('/'))}(?P<path>.+)$", serve_media))
+    return patterns
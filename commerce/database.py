@@ -0,0 +1,110 @@
+"""
+Database configuration for running the site on SQLite under real traffic.
+
+The database file is switched to WAL journaling once, by a migration that
+calls `enable_wal()`, so readers no longer block the writer and vice versa.
+The mode is stored in the file, so it isn't set per connection: that would
+rewrite the file whenever any management command merely connected to it.
+
+`sqlite_databases()` builds the DATABASES setting. Every connection gets
+synchronous=NORMAL (safe in WAL mode, and it spares an fsync per commit), a
+memory-mapped read path and a busy timeout so concurrent bid writes wait for
+the lock instead of failing with "database is locked". Connections are kept
+open across requests.
+
+With `replica=True` a second, read-only connection to the same file is
+added as the "replica" alias. Views decorated with `@read_from_replica`
+send their reads there through ReadReplicaRouter, so read-heavy pages
+never queue behind a connection that is in the middle of a write
+transaction.
+"""
+import asyncio
+import contextvars
+import functools
+from pathlib import Path
+
+from django.conf import settings
+
+
+PRAGMAS = {
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+}
+
+
+def sqlite_databases(path, replica=False, conn_max_age=600, pragmas=None):
+    path = Path(path)
+    pragmas = {**PRAGMAS, **(pragmas or {})}
+    databases = {
+        "default": {
+            "ENGINE": "commerce.sqlite_backend",
+            "NAME": str(path),
+            "CONN_MAX_AGE": conn_max_age,
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"pragmas": pragmas},
+        }
+    }
+    if replica:
+        # journal_mode can't be changed on a read-only connection; migrating
+        # has already put the file in WAL mode. A file: URI has to be
+        # absolute, so resolve a path relative to the cwd.
+        replica_pragmas = {name: value for name, value in pragmas.items() if name != "journal_mode"}
+        databases["replica"] = {
+            **databases["default"],
+            "NAME": f"{path.resolve().as_uri()}?mode=ro",
+            "OPTIONS": {"pragmas": replica_pragmas},
+            "TEST": {"MIRROR": "default"},
+        }
+    return databases
+
+
+def enable_wal(connection):
+    """Switch an SQLite database to WAL journaling. Must run outside a transaction."""
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode = WAL")
+
+
+_use_replica = contextvars.ContextVar("use_replica", default=False)
+
+
+def read_from_replica(view):
+    """Route the reads made while handling this view to the "replica" database, if there is one."""
+    if asyncio.iscoroutinefunction(view):
+        # sync_to_async copies the context, so ORM calls from async views see the flag too
+        @functools.wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            token = _use_replica.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+        return async_wrapper
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _use_replica.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get() and "replica" in settings.DATABASES:
+            return "replica"
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases are the same database
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == "default"
@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/3.0/ref/settings/
 """
 
 import os
+import sys
 from pathlib import Path
 
+from .database import sqlite_databases
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 # default code: BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -47,19 +50,37 @@ MIDDLEWARE = [
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # Django's AuthenticationMiddleware, plus the cached user (auctions/auth.py)
+    'auctions.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request timing, Server-Timing headers and slow request logging
+# (auctions/performance.py). Stats are served to staff at /performance-stats.
+if os.environ.get('AUCTIONS_PERFORMANCE') == '1':
+    MIDDLEWARE.insert(0, 'auctions.middleware.PerformanceMiddleware')
+
+PERFORMANCE_SLOW_REQUEST_MS = 500
+
 ROOT_URLCONF = 'commerce.urls'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Django's backend, plus render timing for PerformanceMiddleware
+        'BACKEND': 'auctions.performance.TimedDjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Outside DEBUG every template is read and compiled once per
+            # process; in DEBUG they are re-read so edits show up straight away
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -76,14 +97,65 @@ WSGI_APPLICATION = 'commerce.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
-DATABASES = {
+# See commerce/database.py for the connection tuning. Set
+# AUCTIONS_READ_REPLICA=1 to serve the read-heavy pages from a separate
+# read-only connection.
+
+DATABASES = sqlite_databases(
+    os.environ.get('AUCTIONS_DATABASE', BASE_DIR / 'db.sqlite3'),
+    replica=os.environ.get('AUCTIONS_READ_REPLICA') == '1',
+)
+
+DATABASE_ROUTERS = ['commerce.database.ReadReplicaRouter']
+
+AUTH_USER_MODEL = 'auctions.User'
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Rendered listing fragments go to a "template_fragments" cache when one is
+# configured here, and to "default" otherwise.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auctions',
     }
 }
 
-AUTH_USER_MODEL = 'auctions.User'
+FRAGMENT_CACHE_TIMEOUT = 600
+
+# Listing counts and price ranges on the categories page. Creating or closing a
+# listing refreshes them; bids don't, so price ranges lag by up to this long.
+CATEGORY_SUMMARY_TIMEOUT = 300
+
+# Token buckets on writes, per user and per client IP (auctions/ratelimit.py):
+# up to `burst` requests at once, refilled at `rate` per second.
+RATE_LIMITS = {
+    'bid': {'rate': 1, 'burst': 10},
+    'comment': {'rate': 0.2, 'burst': 5},
+}
+RATE_LIMIT_CACHE = 'default'
+
+# Step by which proxy bids outbid each other (auctions/bidding.py)
+PROXY_BID_INCREMENT = '1.00'
+
+# Sessions: "db" (Django's default), "cache" (read from the cache, falling back
+# to the database; set SESSION_CACHE_ALIAS to a cache shared by all processes)
+# or "signed_cookies" (nothing stored server side; sessions can't be revoked
+# before they expire). Chosen with AUCTIONS_SESSIONS.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cache': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[os.environ.get('AUCTIONS_SESSIONS', 'db')]
+SESSION_CACHE_ALIAS = 'default'
+
+# Seconds to keep signed-in users in USER_CACHE rather than reading the user
+# row on every request (auctions/auth.py); 0 turns it off. Set with
+# AUCTIONS_USER_CACHE_TIMEOUT, and only with a cache shared by all processes.
+USER_CACHE_TIMEOUT = int(os.environ.get('AUCTIONS_USER_CACHE_TIMEOUT', 0))
+USER_CACHE = 'default'
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -104,6 +176,12 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# The test suite creates users by the dozen; hashing their passwords with
+# PBKDF2 would take most of its run time
+if len(sys.argv) > 1 and sys.argv[1] == 'test':
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.0/topics/i18n/
 
@@ -125,6 +203,37 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [
 #    BASE_DIR / "static", 
 ]
+STATIC_ROOT = os.environ.get('AUCTIONS_STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# Outside DEBUG, collectstatic writes content-hashed names plus gzip/brotli
+# copies (commerce/assets.py), so {% static %} URLs change whenever the file
+# does and can be cached for a year. Set AUCTIONS_STATIC_MANIFEST to 1 or 0 to
+# override.
+STATIC_MANIFEST = os.environ.get('AUCTIONS_STATIC_MANIFEST', '0' if DEBUG else '1') == '1'
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'commerce.assets.CompressedManifestStaticFilesStorage' if STATIC_MANIFEST
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
+# Let Django serve STATIC_ROOT and MEDIA_ROOT itself (commerce/assets.py).
+# Turn these off when a web server or CDN serves the files instead.
+SERVE_STATIC = STATIC_MANIFEST
+SERVE_MEDIA = True
+
+# Cache-Control max-age in seconds. Hashed static names are also marked
+# immutable; unhashed static files and media are revalidated with their ETag
+# once their max-age has passed.
+STATIC_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+UNHASHED_STATIC_CACHE_MAX_AGE = 60 * 60
+MEDIA_CACHE_MAX_AGE = 60 * 60
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -16,7 +16,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import include, path
 
+from . import assets
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    *assets.urlpatterns(),
     path("", include("auctions.urls"))
 ]
\ No newline at end of file